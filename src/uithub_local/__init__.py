@@ -1,6 +1,6 @@
 """Local Uithub package."""
 
-from .api import dump_repo
+from typing import Any
 
 __all__ = [
     "cli",
@@ -11,3 +11,13 @@ __all__ = [
     "downloader",
     "dump_repo",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    # Resolve ``dump_repo`` on first access so importing the package (and the
+    # CLI) stays cheap until the API is actually used.
+    if name == "dump_repo":
+        from .api import dump_repo
+
+        return dump_repo
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,12 +2,74 @@
 
 from __future__ import annotations
 
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator, List, Tuple
 
 from .downloader import download_repo
-from .renderer import render, render_split
-from .walker import DEFAULT_MAX_SIZE, collect_files
+from .renderer import render, render_iter, render_split
+from .walker import DEFAULT_MAX_SIZE, FileInfo, collect_files
+
+
+def _looks_remote(path_or_url: str | Path) -> bool:
+    """Return True when *path_or_url* is clearly a URL rather than a path."""
+    if isinstance(path_or_url, Path):
+        return False
+    return "://" in path_or_url or path_or_url.startswith("git@")
+
+
+@contextmanager
+def _prepare_files(
+    path_or_url: str | Path, **cli_kwargs: Any
+) -> Iterator[Tuple[Path, List[FileInfo], bool]]:
+    """Yield ``(root, files, local)`` for a local directory or a downloaded repo.
+
+    Remote repositories are only available while the context is open, so
+    *local* is False for them and their Dump should not be cached.
+    """
+    collect_opts = {
+        "max_size": cli_kwargs.get("max_size", DEFAULT_MAX_SIZE),
+        "binary_strict": cli_kwargs.get("binary_strict", True),
+        "respect_gitignore": cli_kwargs.get("respect_gitignore", True),
+    }
+    include = cli_kwargs.get("include", ["*"])
+    exclude = cli_kwargs.get("exclude", [])
+
+    if not _looks_remote(path_or_url):
+        path = Path(path_or_url)
+        if path.exists():
+            yield path, collect_files(path, include, exclude, **collect_opts), True
+            return
+
+    with download_repo(
+        str(path_or_url),
+        cli_kwargs.get("private_token"),
+        use_cache=cli_kwargs.get("use_cache"),
+    ) as tmp:
+        yield tmp, collect_files(tmp, include, exclude, **collect_opts), False
+
+
+def _run(
+    path_or_url: str | Path,
+    *,
+    split: int | None = None,
+    fmt: str = "text",
+    **cli_kwargs: Any,
+) -> List[Tuple[str | None, str]]:
+    """Collect and render *path_or_url*, returning ``(filename, content)`` parts.
+
+    Without *split* a single ``(None, content)`` part is returned.
+    """
+    render_opts = {
+        "max_tokens": cli_kwargs.get("max_tokens"),
+        "fmt": fmt,
+        "exclude_comments": cli_kwargs.get("exclude_comments", False),
+        "dedupe": cli_kwargs.get("dedupe", False),
+    }
+    with _prepare_files(path_or_url, **cli_kwargs) as (root, files, local):
+        if split:
+            return list(render_split(files, root, split, reuse=local, **render_opts))
+        return [(None, render(files, root, reuse=local, **render_opts))]
 
 
 def dump_repo(
@@ -26,56 +88,45 @@ def dump_repo(
             value is not used by ``dump_repo`` itself.
         **cli_kwargs: Extra options matching the CLI such as ``include``,
             ``exclude``, ``max_size``, ``max_tokens``, ``binary_strict``,
-            ``exclude_comments``, ``respect_gitignore`` and ``private_token``.
+            ``exclude_comments``, ``respect_gitignore``, ``private_token``,
+            ``use_cache`` and ``dedupe``.
 
     Returns:
         The rendered dump.
     """
+    return _run(path_or_url, fmt=fmt, **cli_kwargs)[0][1]
 
-    include = cli_kwargs.get("include", ["*"])
-    exclude = cli_kwargs.get("exclude", [])
-    max_size = cli_kwargs.get("max_size", DEFAULT_MAX_SIZE)
-    max_tokens = cli_kwargs.get("max_tokens")
-    binary_strict = cli_kwargs.get("binary_strict", True)
-    exclude_comments = cli_kwargs.get("exclude_comments", False)
-    respect_gitignore = cli_kwargs.get("respect_gitignore", True)
-    private_token = cli_kwargs.get("private_token")
-
-    path = Path(path_or_url)
-    if path.exists():
-        files = collect_files(
-            path,
-            include,
-            exclude,
-            max_size=max_size,
-            binary_strict=binary_strict,
-            respect_gitignore=respect_gitignore,
-        )
-        return render(
-            files,
-            path,
-            max_tokens=max_tokens,
-            fmt=fmt,
-            exclude_comments=exclude_comments,
-        )
-
-    url = str(path_or_url)
-    with download_repo(url, private_token) as tmp:
-        files = collect_files(
-            tmp,
-            include,
-            exclude,
-            max_size=max_size,
-            binary_strict=binary_strict,
-            respect_gitignore=respect_gitignore,
-        )
-        return render(
-            files,
-            tmp,
-            max_tokens=max_tokens,
-            fmt=fmt,
-            exclude_comments=exclude_comments,
-        )
+
+def dump_repo_iter(
+    path_or_url: str | Path,
+    *,
+    fmt: str = "text",
+    **cli_kwargs: Any,
+) -> Iterator[str]:
+    """Yield a repository dump piece by piece.
+
+    Joining the pieces gives the same result as :func:`dump_repo`. Nothing
+    is collected or downloaded until the first piece is requested.
+
+    Args:
+        path_or_url: Local directory or remote repository URL.
+        fmt: Output format ("text", "json" or "html").
+        **cli_kwargs: Extra options matching the CLI.
+
+    Yields:
+        Consecutive pieces of the rendered dump.
+    """
+    render_opts = {
+        "max_tokens": cli_kwargs.get("max_tokens"),
+        "fmt": fmt,
+        "exclude_comments": cli_kwargs.get("exclude_comments", False),
+        "dedupe": cli_kwargs.get("dedupe", False),
+    }
+    with _prepare_files(path_or_url, **cli_kwargs) as (root, files, local):
+        pieces = render_iter(files, root, reuse=local, **render_opts)
+    # Contents are already in memory, so a downloaded repo can be removed
+    # before the caller starts consuming.
+    yield from pieces
 
 
 def dump_repo_split(
@@ -96,49 +147,4 @@ def dump_repo_split(
     Returns:
         A list of (filename, content) tuples.
     """
-    include = cli_kwargs.get("include", ["*"])
-    exclude = cli_kwargs.get("exclude", [])
-    max_size = cli_kwargs.get("max_size", DEFAULT_MAX_SIZE)
-    max_tokens = cli_kwargs.get("max_tokens")
-    binary_strict = cli_kwargs.get("binary_strict", True)
-    exclude_comments = cli_kwargs.get("exclude_comments", False)
-    respect_gitignore = cli_kwargs.get("respect_gitignore", True)
-    private_token = cli_kwargs.get("private_token")
-
-    path = Path(path_or_url)
-    if path.exists():
-        files = collect_files(
-            path,
-            include,
-            exclude,
-            max_size=max_size,
-            binary_strict=binary_strict,
-            respect_gitignore=respect_gitignore,
-        )
-        return render_split(
-            files,
-            path,
-            split,
-            max_tokens=max_tokens,
-            fmt=fmt,
-            exclude_comments=exclude_comments,
-        )
-
-    url = str(path_or_url)
-    with download_repo(url, private_token) as tmp:
-        files = collect_files(
-            tmp,
-            include,
-            exclude,
-            max_size=max_size,
-            binary_strict=binary_strict,
-            respect_gitignore=respect_gitignore,
-        )
-        return render_split(
-            files,
-            tmp,
-            split,
-            max_tokens=max_tokens,
-            fmt=fmt,
-            exclude_comments=exclude_comments,
-        )
+    return _run(path_or_url, split=split, fmt=fmt, **cli_kwargs)
@@ -3,27 +3,35 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import List, cast
+from typing import Any, List, Tuple, cast
 
 import click
 
-from .renderer import render, render_split
-from .walker import DEFAULT_MAX_SIZE, collect_files
-from .downloader import download_repo
+from .walker import DEFAULT_MAX_SIZE
 
 
-def _expand_comma_separated(patterns: List[str]) -> List[str]:
-    """Expand comma-separated patterns into individual patterns.
-    
+class CommaSeparatedPatterns(click.ParamType):
+    """Click type that splits a comma-separated glob list as it is parsed.
+
     Example:
-        ["*.py", "*.html,*.js"] -> ["*.py", "*.html", "*.js"]
+        "*.html, *.js" -> ("*.html", "*.js")
     """
-    expanded = []
-    for pattern in patterns:
-        # Split by comma and strip whitespace from each part
-        parts = [p.strip() for p in pattern.split(",")]
-        expanded.extend(parts)
-    return expanded
+
+    name = "pattern"
+
+    def convert(
+        self, value: Any, param: click.Parameter | None, ctx: click.Context | None
+    ) -> Tuple[str, ...]:
+        if isinstance(value, tuple):
+            return value
+        return tuple(p.strip() for p in str(value).split(","))
+
+
+def _flatten_patterns(
+    ctx: click.Context, param: click.Parameter, value: Tuple[Tuple[str, ...], ...]
+) -> List[str]:
+    """Merge the per-flag pattern tuples of a ``multiple`` option."""
+    return [pattern for group in value for pattern in group]
 
 
 @click.command(context_settings={"help_option_names": ["-h", "--help"]})
@@ -43,11 +51,15 @@ def _expand_comma_separated(patterns: List[str]) -> List[str]:
     "--include",
     multiple=True,
     default=["*"],
+    type=CommaSeparatedPatterns(),
+    callback=_flatten_patterns,
     help=("Glob(s) to include. Supports comma-separated patterns. Trailing '/' or '\\' expands recursively."),
 )
 @click.option(
     "--exclude",
     multiple=True,
+    type=CommaSeparatedPatterns(),
+    callback=_flatten_patterns,
     help=(
         "Glob(s) to exclude. Supports comma-separated patterns. Trailing '/' or '\\' expands recursively. "
         "'.git/' is excluded by default."
@@ -72,6 +84,12 @@ def _expand_comma_separated(patterns: List[str]) -> List[str]:
     type=click.Choice(["text", "json", "html"]),
     default="text",
 )
+@click.option(
+    "--dedupe",
+    is_flag=True,
+    default=False,
+    help="JSON only: store repeated file contents once in a blobs map",
+)
 @click.option(
     "--binary-strict/--no-binary-strict",
     default=True,
@@ -89,6 +107,12 @@ def _expand_comma_separated(patterns: List[str]) -> List[str]:
     default=False,
     help="Do not respect .gitignore rules (default: respect .gitignore)",
 )
+@click.option(
+    "--cache/--no-cache",
+    default=False,
+    envvar="UITHUB_LOCAL_CACHE",
+    help="Keep extracted remote archives and revalidate them by ETag",
+)
 @click.option("--stdout/--no-stdout", default=True, help="Print dump to STDOUT")
 @click.option("--outfile", type=click.Path(path_type=Path), help="Write dump to file")
 @click.option(
@@ -112,9 +136,11 @@ def main(
     max_tokens: int | None,
     split: int | None,
     fmt: str,
+    dedupe: bool,
     binary_strict: bool,
     exclude_comments: bool,
     not_ignore: bool,
+    cache: bool,
     stdout: bool,
     outfile: Path | None,
     encoding: str,
@@ -144,74 +170,26 @@ def main(
     if split and outfile is None:
         raise click.UsageError("--split requires --outfile")
 
-    # Expand comma-separated patterns
-    include = _expand_comma_separated(list(include))
-    exclude = _expand_comma_separated(list(exclude))
+    # Imported here so ``--help`` and shell completion never load requests,
+    # the archive extractors or the renderer.
+    from .api import _run
 
     try:
-        if remote_url:
-            with download_repo(remote_url, private_token) as tmp:
-                files = collect_files(
-                    tmp,
-                    include,
-                    exclude,
-                    max_size=max_size,
-                    binary_strict=binary_strict,
-                    respect_gitignore=not not_ignore,
-                )
-                if split:
-                    outputs = render_split(
-                        files,
-                        tmp,
-                        split,
-                        max_tokens=max_tokens,
-                        fmt=fmt,
-                        exclude_comments=exclude_comments,
-                    )
-                else:
-                    outputs = [
-                        (
-                            None,
-                            render(
-                                files,
-                                tmp,
-                                max_tokens=max_tokens,
-                                fmt=fmt,
-                                exclude_comments=exclude_comments,
-                            ),
-                        )
-                    ]
-        else:
-            files = collect_files(
-                cast(Path, path),
-                include,
-                exclude,
-                max_size=max_size,
-                binary_strict=binary_strict,
-                respect_gitignore=not not_ignore,
-            )
-            if split:
-                outputs = render_split(
-                    files,
-                    cast(Path, path),
-                    split,
-                    max_tokens=max_tokens,
-                    fmt=fmt,
-                    exclude_comments=exclude_comments,
-                )
-            else:
-                outputs = [
-                    (
-                        None,
-                        render(
-                            files,
-                            cast(Path, path),
-                            max_tokens=max_tokens,
-                            fmt=fmt,
-                            exclude_comments=exclude_comments,
-                        ),
-                    )
-                ]
+        outputs = _run(
+            remote_url or cast(Path, path),
+            split=split,
+            fmt=fmt,
+            include=include,
+            exclude=exclude,
+            max_size=max_size,
+            max_tokens=max_tokens,
+            binary_strict=binary_strict,
+            exclude_comments=exclude_comments,
+            dedupe=dedupe,
+            respect_gitignore=not not_ignore,
+            private_token=private_token,
+            use_cache=cache,
+        )
     except Exception as exc:  # pragma: no cover - fatal CLI errors
         click.echo(str(exc), err=True)
         raise SystemExit(1)
@@ -221,7 +199,7 @@ def main(
         # Write multiple files
         base_dir = cast(Path, outfile).parent
         for filename, content in outputs:
-            output_path = base_dir / filename
+            output_path = base_dir / cast(str, filename)
             output_path.write_text(content, encoding=encoding, errors="replace")
             if stdout:
                 click.echo(f"Written {output_path}")
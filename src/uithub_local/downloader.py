@@ -2,21 +2,116 @@
 
 from __future__ import annotations
 
+import functools
 import io
+import json
+import os
+import queue
+import shutil
+import tarfile
+import threading
 import time
 import urllib.parse
 import requests  # type: ignore
+from requests.adapters import HTTPAdapter  # type: ignore
+from urllib3.util.retry import Retry
 import zipfile
-from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, contextmanager
+from functools import partial
 from pathlib import Path
-from tempfile import TemporaryDirectory
-from typing import Iterator
+from tempfile import SpooledTemporaryFile, TemporaryDirectory, mkdtemp, mkstemp
+from typing import IO, Any, Iterable, Iterator
+
+try:  # optional: libarchive inflates faster (it can link against zlib-ng)
+    import libarchive  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    libarchive = None
+
+try:  # POSIX advisory locks guard the cache index across processes
+    import fcntl
+except Exception:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore[assignment]
+
+try:  # optional: stream-unzip extracts entries while the body downloads
+    from stream_unzip import stream_unzip  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    stream_unzip = None
+
+# Archives up to this size stay in memory; larger ones spill to disk.
+SPOOL_MAX_SIZE = 64 * 1024 * 1024
+_COPY_CHUNK = 1 << 20
+_GZIP_MAGIC = b"\x1f\x8b"
+# Members handed to each extraction worker; small archives extract serially.
+_EXTRACT_BATCH = 64
+_CACHE_INDEX = "index.json"
+_CACHE_LOCK_FILE = "index.lock"
+# The archive cache is opt-in: set this to 1 (or pass --cache) to enable it.
+CACHE_ENV = "UITHUB_LOCAL_CACHE"
+# Least recently used extractions are evicted once the cache exceeds this size.
+CACHE_MAX_BYTES_ENV = "UITHUB_LOCAL_CACHE_MAX_BYTES"
+CACHE_MAX_BYTES = 1024 * 1024 * 1024
+_CACHE_THREAD_LOCK = threading.Lock()
+# Cached trees currently yielded by this process, by directory name. Trees
+# that are replaced or evicted while in use are removed on their last release.
+_CACHE_REFS: dict[str, int] = {}
+_CACHE_DOOMED: set[str] = set()
+# Network chunks buffered ahead of the extractor when streaming.
+_PREFETCH_DEPTH = 8
+# RAM-backed scratch space for throwaway extractions, used when it has room.
+_SHM_DIR = "/dev/shm"
+_SHM_MIN_FREE = 512 * 1024 * 1024
+
+# (connect, read) timeouts in seconds for archive requests.
+_TIMEOUT = (5, 60)
+
+
+def _make_session() -> requests.Session:
+    """Return a session that retries transient failures with backoff."""
+    retry = Retry(
+        total=3,
+        backoff_factor=1,
+        status_forcelist=[500, 502, 503, 504],
+        allowed_methods=["GET"],
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# requests.Session is not thread-safe, so each thread (e.g. each server worker)
+# keeps its own; repeated calls on a thread reuse its keep-alive connections.
+_SESSIONS = threading.local()
+
+
+def _session() -> requests.Session:
+    """Return the calling thread's retrying session, creating it on first use."""
+    session = getattr(_SESSIONS, "session", None)
+    if session is None:
+        session = _SESSIONS.session = _make_session()
+    return session
 
 
 @contextmanager
-def download_repo(url: str, token: str | None = None) -> Iterator[Path]:
-    """Yield a temporary directory with the extracted repo from ``url``."""
-    archive_url, subtree = _archive_url(url)
+def download_repo(
+    url: str, token: str | None = None, *, use_cache: bool | None = None
+) -> Iterator[Path]:
+    """Yield a directory with the extracted repo from ``url``.
+
+    With *use_cache* (default: the ``UITHUB_LOCAL_CACHE`` environment
+    variable), archives served with an ``ETag`` are kept under
+    :func:`cache_dir` and revalidated with ``If-None-Match`` on later calls,
+    so an unchanged remote is neither downloaded nor extracted again. The
+    cache is capped at ``UITHUB_LOCAL_CACHE_MAX_BYTES`` (1 GiB by default),
+    evicting least recently used trees. Other archives are extracted into a
+    temporary directory that is removed on exit.
+    """
+    if use_cache is None:
+        use_cache = cache_enabled()
+    archive_url, subtree = _archive_url(url, bool(token))
     headers = {}
     if token:
         if "github.com" in archive_url:
@@ -24,45 +119,463 @@ def download_repo(url: str, token: str | None = None) -> Iterator[Path]:
         else:
             headers["Authorization"] = f"Bearer {token}"
 
-    response = None
-    backoff = 1.0
-    for attempt in range(3):
-        response = requests.get(archive_url, headers=headers, timeout=30)
-        if response.status_code < 500:
-            break
-        if attempt < 2:
-            time.sleep(backoff)
-            backoff *= 2
-    assert response is not None
-    if response.status_code >= 400:
-        raise RuntimeError(
-            f"Failed to download {archive_url} (HTTP {response.status_code})"
+    cached = _cache_acquire(archive_url) if use_cache else None
+    try:
+        if cached is not None:
+            headers["If-None-Match"] = cached[0]
+        response = _session().get(
+            archive_url, headers=headers, timeout=_TIMEOUT, stream=True
         )
-    data = response.content
+        if response.status_code == 304 and cached is not None:
+            response.close()
+            yield _resolve_root(cached[1], subtree)
+            return
+        if response.status_code >= 400:
+            response.close()
+            raise RuntimeError(
+                f"Failed to download {archive_url} (HTTP {response.status_code})"
+            )
+
+        etag = response.headers.get("ETag")
+        if use_cache and etag:
+            dest = Path(mkdtemp(dir=_ensure_cache_dir()))
+            try:
+                _extract_response(response, str(dest))
+                _cache_store(archive_url, etag, dest)
+            except BaseException:
+                shutil.rmtree(dest, ignore_errors=True)
+                raise
+            try:
+                yield _resolve_root(dest, subtree)
+            finally:
+                _cache_release(dest.name)
+            return
+
+        length = response.headers.get("Content-Length")
+        tmp = TemporaryDirectory(dir=_scratch_dir(int(length) if length else None))
+        try:
+            _extract_response(response, tmp.name)
+            yield _resolve_root(Path(tmp.name), subtree)
+        finally:
+            tmp.cleanup()
+    finally:
+        if cached is not None:
+            _cache_release(cached[1].name)
+
+
+def _scratch_dir(archive_size: int | None) -> str | None:
+    """Return a tmpfs parent for a temporary extraction, or None for the default.
+
+    The extracted tree is read once and discarded, so keeping it in RAM skips
+    filesystem journaling. ``/dev/shm`` is only used when its free space covers
+    ``_SHM_MIN_FREE`` and four times the archive size, since it is often small
+    inside containers.
+    """
+    if not os.path.isdir(_SHM_DIR) or not os.access(_SHM_DIR, os.W_OK):
+        return None
+    try:
+        stats = os.statvfs(_SHM_DIR)
+    except (AttributeError, OSError):
+        return None
+    free = stats.f_bavail * stats.f_frsize
+    needed = max(_SHM_MIN_FREE, 4 * (archive_size or 0))
+    return _SHM_DIR if free >= needed else None
+
+
+def cache_enabled() -> bool:
+    """Return True when ``UITHUB_LOCAL_CACHE`` turns the archive cache on."""
+    return os.environ.get(CACHE_ENV, "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def cache_dir() -> Path:
+    """Return the directory holding cached archive extractions."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join("~", ".cache")
+    return Path(base).expanduser() / "uithub-local"
+
+
+def _cache_max_bytes() -> int:
+    try:
+        return int(os.environ.get(CACHE_MAX_BYTES_ENV, CACHE_MAX_BYTES))
+    except ValueError:
+        return CACHE_MAX_BYTES
+
+
+def _ensure_cache_dir() -> Path:
+    path = cache_dir()
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+@contextmanager
+def _cache_locked() -> Iterator[Path]:
+    """Hold the cache lock (threads of this process, and other processes)."""
+    with _CACHE_THREAD_LOCK:
+        root = _ensure_cache_dir()
+        with open(root / _CACHE_LOCK_FILE, "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield root
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _load_cache_index() -> dict[str, dict[str, Any]]:
+    try:
+        with open(cache_dir() / _CACHE_INDEX, encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _write_cache_index(root: Path, index: dict[str, dict[str, Any]]) -> bool:
+    fd, tmp_name = mkstemp(dir=root, suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(index, fh)
+        os.replace(tmp_name, root / _CACHE_INDEX)
+    except OSError:
+        Path(tmp_name).unlink(missing_ok=True)
+        return False
+    return True
+
+
+def _cache_acquire(archive_url: str) -> tuple[str, Path] | None:
+    """Return ``(etag, extracted_dir)`` cached for *archive_url*, if any.
+
+    The tree is marked in use (see :func:`_cache_release`) and as recently
+    used for eviction.
+    """
+    with _cache_locked() as root:
+        index = _load_cache_index()
+        entry = index.get(archive_url)
+        if not isinstance(entry, dict):
+            return None
+        etag, name = entry.get("etag"), entry.get("path")
+        if not etag or not name or not (root / name).is_dir():
+            return None
+        _CACHE_REFS[name] = _CACHE_REFS.get(name, 0) + 1
+        entry["used"] = time.time()
+        _write_cache_index(root, index)
+        return etag, root / name
+
+
+def _cache_release(name: str) -> None:
+    """Drop one use of the cached tree *name*, removing it if it was replaced."""
+    with _CACHE_THREAD_LOCK:
+        count = _CACHE_REFS.get(name, 0) - 1
+        if count > 0:
+            _CACHE_REFS[name] = count
+            return
+        _CACHE_REFS.pop(name, None)
+        if name not in _CACHE_DOOMED:
+            return
+        _CACHE_DOOMED.discard(name)
+    _remove_tree(cache_dir() / name)
+
 
-    tmp = TemporaryDirectory()
+def _remove_tree(path: Path) -> None:
+    # Rename first so the name is gone at once, then delete at leisure.
+    trash = path.with_name(f".trash-{path.name}")
     try:
-        with zipfile.ZipFile(io.BytesIO(data)) as zf:
-            zf.extractall(tmp.name)
-        root_entries = list(Path(tmp.name).iterdir())
-        single = len(root_entries) == 1 and root_entries[0].is_dir()
-        root = root_entries[0] if single else Path(tmp.name)
-        
-        target = root
-        if subtree:
-            target = root / subtree
-            if not target.exists():
-                # Some zipballs might have different internal structures
-                # but usually it's {owner}-{repo}-{sha}
-                raise RuntimeError(f"Subtree path '{subtree}' not found in repository")
-                
-        yield target
+        os.replace(path, trash)
+    except OSError:
+        trash = path
+    shutil.rmtree(trash, ignore_errors=True)
+
+
+def _tree_size(path: Path) -> int:
+    total = 0
+    for dirpath, _dirs, names in os.walk(path):
+        for name in names:
+            try:
+                total += os.lstat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                continue
+    return total
+
+
+def _cache_store(archive_url: str, etag: str, path: Path) -> None:
+    """Record *path* as the extraction of *archive_url* at *etag*.
+
+    The new tree is marked in use by the caller. The tree it replaces, and
+    any trees evicted to respect the size cap, are removed once no caller of
+    this process uses them any more.
+    """
+    size = _tree_size(path)
+    with _cache_locked() as root:
+        _CACHE_REFS[path.name] = _CACHE_REFS.get(path.name, 0) + 1
+        index = _load_cache_index()
+        previous = index.get(archive_url)
+        index[archive_url] = {
+            "etag": etag,
+            "path": path.name,
+            "size": size,
+            "used": time.time(),
+        }
+        stale = []
+        if isinstance(previous, dict) and previous.get("path") not in (
+            None,
+            path.name,
+        ):
+            stale.append(str(previous["path"]))
+        for key in [k for k, e in index.items() if not isinstance(e, dict)]:
+            del index[key]
+        total = sum(int(e.get("size", 0)) for e in index.values())
+        oldest = sorted(
+            (k for k in index if k != archive_url),
+            key=lambda k: float(index[k].get("used", 0)),
+        )
+        limit = _cache_max_bytes()
+        for key in oldest:
+            if total <= limit:
+                break
+            entry = index.pop(key)
+            total -= int(entry.get("size", 0))
+            if entry.get("path"):
+                stale.append(str(entry["path"]))
+        if not _write_cache_index(root, index):
+            # Not recorded, so nothing else will ever reuse or remove it.
+            _CACHE_DOOMED.add(path.name)
+            return
+        removable = []
+        for name in stale:
+            if _CACHE_REFS.get(name):
+                _CACHE_DOOMED.add(name)
+            else:
+                removable.append(name)
+    for name in removable:
+        _remove_tree(root / name)
+
+
+def _extract_response(response: requests.Response, dest: str) -> None:
+    """Extract the archive body of *response* into *dest*.
+
+    The body is read by a background thread (see :func:`_prefetch`) and the
+    format is sniffed from its first bytes. Gzipped tarballs are extracted as
+    they stream in, as are zips when ``stream-unzip`` is installed. Other zips
+    are spooled first, since ``zipfile`` and libarchive need the central
+    directory at the end.
+    """
+    with response, closing(_prefetch(response.iter_content(_COPY_CHUNK))) as chunks:
+        body = io.BufferedReader(_ChunkStream(chunks), _COPY_CHUNK)
+        if body.peek(len(_GZIP_MAGIC)).startswith(_GZIP_MAGIC):
+            _extract_tar(body, dest)
+            return
+        if stream_unzip is not None:
+            _extract_stream_unzip(iter(partial(body.read, _COPY_CHUNK), b""), dest)
+            return
+        with SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as spool:
+            shutil.copyfileobj(body, spool, length=_COPY_CHUNK)
+            spool.seek(0)
+            if libarchive is not None:
+                _extract_libarchive(spool, dest)
+            else:
+                with zipfile.ZipFile(spool) as zf:
+                    _extract_zip(zf, dest)
+
+
+class _ChunkStream(io.RawIOBase):
+    """Read-only raw stream over an iterator of byte chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._pending = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        while not self._pending:
+            try:
+                self._pending = memoryview(next(self._chunks))
+            except StopIteration:
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def _tar_filter(member: tarfile.TarInfo, path: str) -> tarfile.TarInfo | None:
+    """Apply tarfile's ``data`` filter, skipping members it rejects."""
+    try:
+        return tarfile.data_filter(member, path)
+    except tarfile.FilterError:
+        return None
+
+
+def _extract_tar(stream: IO[bytes], dest: str) -> None:
+    """Extract a gzipped tarball read sequentially from *stream* into *dest*."""
+    with tarfile.open(fileobj=stream, mode="r|gz") as tar:
+        if hasattr(tarfile, "data_filter"):
+            tar.extractall(dest, filter=_tar_filter)
+            return
+        # Python < 3.11.4 has no extraction filters: keep plain files and dirs.
+        for member in tar:  # pragma: no cover - depends on the interpreter
+            parts = _safe_parts(member.name)
+            if not parts or not (member.isreg() or member.isdir()):
+                continue
+            member.name = "/".join(parts)
+            tar.extract(member, dest)
+
+
+def _resolve_root(base: Path, subtree: str | None) -> Path:
+    """Return the repository root (or *subtree* of it) inside *base*."""
+    root_entries = list(base.iterdir())
+    single = len(root_entries) == 1 and root_entries[0].is_dir()
+    root = root_entries[0] if single else base
+
+    target = root
+    if subtree:
+        target = root / subtree
+        if not target.exists():
+            # Some zipballs might have different internal structures
+            # but usually it's {owner}-{repo}-{sha}
+            raise RuntimeError(f"Subtree path '{subtree}' not found in repository")
+    return target
+
+
+def _prefetch(chunks: Iterable[bytes], depth: int = _PREFETCH_DEPTH) -> Iterator[bytes]:
+    """Yield from *chunks* while a background thread reads up to *depth* ahead."""
+    buffer: queue.Queue[object] = queue.Queue(maxsize=depth)
+    done = object()
+    stop = threading.Event()
+
+    def _put(item: object) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _reader() -> None:
+        try:
+            for chunk in chunks:
+                if not _put(chunk):
+                    return
+        except BaseException as exc:  # handed to the consumer
+            _put(exc)
+            return
+        _put(done)
+
+    thread = threading.Thread(target=_reader, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is done:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item  # type: ignore[misc]
     finally:
-        tmp.cleanup()
+        stop.set()
+        thread.join()
+
+
+def _safe_parts(name: str) -> list[str]:
+    """Split an archive member name, dropping empty, ``.`` and ``..`` parts."""
+    return [p for p in name.split("/") if p not in ("", ".", "..")]
+
+
+def _extract_stream_unzip(chunks: Iterable[bytes], dest: str) -> None:
+    """Extract a zip read sequentially from *chunks* into *dest*."""
+    for raw_name, _size, data in stream_unzip(chunks):
+        try:
+            name = raw_name.decode("utf-8")
+        except UnicodeDecodeError:
+            name = raw_name.decode("cp437")
+        parts = _safe_parts(name)
+        if not parts or name.endswith("/"):
+            for _ in data:  # every entry must be drained before the next
+                pass
+            if parts:
+                os.makedirs(os.path.join(dest, *parts), exist_ok=True)
+            continue
+        target = os.path.join(dest, *parts)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as fh:
+            for block in data:
+                fh.write(block)
+
 
+def _extract_zip(zf: zipfile.ZipFile, dest: str) -> None:
+    """Extract every member of *zf* into *dest*, in parallel when worthwhile.
 
-def _archive_url(url: str) -> tuple[str, str | None]:
-    if url.endswith(".zip"):
+    Inflating and writing release the GIL, so members are spread over a thread
+    pool. ``ZipFile`` serialises the underlying reads itself; directories are
+    created up front so workers never race on ``mkdir``.
+    """
+    members = zf.infolist()
+    workers = min(32, os.cpu_count() or 1)
+    if workers < 2 or len(members) <= _EXTRACT_BATCH:
+        zf.extractall(dest)
+        return
+
+    files = []
+    for member in members:
+        parts = _safe_parts(member.filename)
+        if member.is_dir():
+            os.makedirs(os.path.join(dest, *parts), exist_ok=True)
+            continue
+        if len(parts) > 1:
+            os.makedirs(os.path.join(dest, *parts[:-1]), exist_ok=True)
+        files.append(member)
+
+    def _extract_batch(batch: list[zipfile.ZipInfo]) -> None:
+        for member in batch:
+            zf.extract(member, dest)
+
+    batches = [
+        files[i : i + _EXTRACT_BATCH] for i in range(0, len(files), _EXTRACT_BATCH)
+    ]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # ``list`` propagates the first worker exception, if any.
+        list(pool.map(_extract_batch, batches))
+
+
+def _extract_libarchive(stream: IO[bytes], dest: str) -> None:
+    """Extract the archive read from *stream* into *dest* using libarchive.
+
+    libarchive's own extract helpers write relative to the process working
+    directory, so entries are written here with the same path sanitising as
+    ``zipfile``. Links and special files are skipped.
+    """
+    with libarchive.stream_reader(stream) as archive:
+        for entry in archive:
+            parts = _safe_parts(entry.pathname)
+            if not parts:
+                continue
+            target = os.path.join(dest, *parts)
+            if entry.isdir:
+                os.makedirs(target, exist_ok=True)
+                continue
+            if not entry.isreg:
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, "wb") as fh:
+                for block in entry.get_blocks():
+                    fh.write(block)
+
+
+@functools.lru_cache(maxsize=64)
+def _archive_url(
+    url: str, private: bool = False, prefer_tar: bool = True
+) -> tuple[str, str | None]:
+    """Return ``(archive_url, subtree)`` for a repository *url*.
+
+    Public GitHub repositories are fetched straight from codeload, which skips
+    the API redirect and its rate limit. *private* (a token is available) keeps
+    the API endpoint, which is what authorises private archives. With
+    *prefer_tar*, hosts are asked for a ``.tar.gz``: it has no per-entry CRC or
+    central directory and can be extracted while it downloads.
+    """
+    if url.endswith((".zip", ".tar.gz", ".tgz")):
         return url, None
 
     parsed = urllib.parse.urlparse(url)
@@ -87,17 +600,24 @@ def _archive_url(url: str) -> tuple[str, str | None]:
     if host.endswith("github.com"):
         # Handle /tree/{branch}/{path}
         parts = slug.split("/")
+        branch = None
         if len(parts) > 3 and parts[2] == "tree":
-            owner, repo = parts[0], parts[1]
             branch = parts[3]
             subtree = "/".join(parts[4:]) if len(parts) > 4 else None
-            return f"https://api.github.com/repos/{owner}/{repo}/zipball/{branch}", subtree
-        
-        return f"https://api.github.com/repos/{slug}/zipball", None
-        
+        if private or len(parts) < 2:
+            base = "/".join(parts[:2]) if branch else slug
+            suffix = f"/{branch}" if branch else ""
+            kind = "tarball" if prefer_tar else "zipball"
+            return f"https://api.github.com/repos/{base}/{kind}{suffix}", subtree
+        owner, repo = parts[0], parts[1]
+        ref = branch or "HEAD"
+        kind = "tar.gz" if prefer_tar else "zip"
+        return f"https://codeload.github.com/{owner}/{repo}/{kind}/{ref}", subtree
+
+    ext = "tar.gz" if prefer_tar else "zip"
     if host.endswith("gitlab.com"):
         repo = slug.split("/")[-1]
-        return f"https://gitlab.com/{slug}/-/archive/master/{repo}-master.zip", None
+        return f"https://gitlab.com/{slug}/-/archive/master/{repo}-master.{ext}", None
     if host.endswith("bitbucket.org"):
-        return f"https://bitbucket.org/{slug}/get/master.zip", None
+        return f"https://bitbucket.org/{slug}/get/master.{ext}", None
     raise ValueError("Unsupported host")
@@ -1,22 +1,161 @@
-HTML_TEMPLATE = """
+"""Single-page web GUI served by the API server."""
+
+from __future__ import annotations
+
+import gzip
+import re
+
+# The page carries the handful of Tailwind utilities it uses instead of
+# loading the Tailwind runtime from a CDN, so it renders offline and runs no
+# third-party script.
+HTML_TEMPLATE = r"""
 <!DOCTYPE html>
 <html lang="en" class="dark">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>uithub-local | Repository flattener</title>
-    <script src="https://cdn.tailwindcss.com"></script>
     <link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap" rel="stylesheet">
-    <script src="https://unpkg.com/lucide@latest"></script>
     <style>
+        *, ::before, ::after { box-sizing: border-box; border: 0 solid #e5e7eb; }
+        html { line-height: 1.5; -webkit-text-size-adjust: 100%; }
+        body, h1, p { margin: 0; }
+        body { line-height: inherit; }
+        h1 { font-size: inherit; font-weight: inherit; }
+        a { color: inherit; text-decoration: inherit; }
+        button, input, select { font: inherit; color: inherit; margin: 0; padding: 0; }
+        button { background: transparent; cursor: pointer; }
+        button:disabled { cursor: default; }
+        input::placeholder { opacity: 1; color: #9ca3af; }
+        svg { display: block; vertical-align: middle; }
+
+        .hidden { display: none; }
+        .flex { display: flex; }
+        .grid { display: grid; }
+        .flex-col { flex-direction: column; }
+        .items-center { align-items: center; }
+        .justify-center { justify-content: center; }
+        .grid-cols-1 { grid-template-columns: repeat(1, minmax(0, 1fr)); }
+        .gap-1 { gap: .25rem; }
+        .gap-2 { gap: .5rem; }
+        .gap-4 { gap: 1rem; }
+        .gap-6 { gap: 1.5rem; }
+        .space-y-2 > :not([hidden]) ~ :not([hidden]) { margin-top: .5rem; }
+        .space-y-4 > :not([hidden]) ~ :not([hidden]) { margin-top: 1rem; }
+        .space-y-6 > :not([hidden]) ~ :not([hidden]) { margin-top: 1.5rem; }
+        .relative { position: relative; }
+        .absolute { position: absolute; }
+        .top-0 { top: 0; }
+        .top-2 { top: .5rem; }
+        .top-2\.5 { top: .625rem; }
+        .left-0 { left: 0; }
+        .left-3 { left: .75rem; }
+        .right-2 { right: .5rem; }
+        .overflow-hidden { overflow: hidden; }
+        .w-full { width: 100%; }
+        .w-3 { width: .75rem; }
+        .w-4 { width: 1rem; }
+        .h-1 { height: .25rem; }
+        .h-3 { height: .75rem; }
+        .h-4 { height: 1rem; }
+        .max-w-2xl { max-width: 42rem; }
+        .min-h-screen { min-height: 100vh; }
+        .p-3 { padding: .75rem; }
+        .p-4 { padding: 1rem; }
+        .p-8 { padding: 2rem; }
+        .px-4 { padding-left: 1rem; padding-right: 1rem; }
+        .py-2 { padding-top: .5rem; padding-bottom: .5rem; }
+        .py-3 { padding-top: .75rem; padding-bottom: .75rem; }
+        .pl-10 { padding-left: 2.5rem; }
+        .pr-4 { padding-right: 1rem; }
+        .pr-8 { padding-right: 2rem; }
+        .pt-2 { padding-top: .5rem; }
+        .pt-4 { padding-top: 1rem; }
+        .mb-2 { margin-bottom: .5rem; }
+        .mb-8 { margin-bottom: 2rem; }
+        .mt-8 { margin-top: 2rem; }
+        .text-center { text-align: center; }
+        .text-\[10px\] { font-size: 10px; }
+        .text-\[11px\] { font-size: 11px; }
+        .text-xs { font-size: .75rem; line-height: 1rem; }
+        .text-sm { font-size: .875rem; line-height: 1.25rem; }
+        .text-4xl { font-size: 2.25rem; line-height: 2.5rem; }
+        .font-semibold { font-weight: 600; }
+        .font-bold { font-weight: 700; }
+        .font-mono {
+            font-family: ui-monospace, SFMono-Regular, Menlo, Monaco, Consolas,
+                'Liberation Mono', 'Courier New', monospace;
+        }
+        .uppercase { text-transform: uppercase; }
+        .tracking-tight { letter-spacing: -.025em; }
+        .tracking-wider { letter-spacing: .05em; }
+        .tracking-\[2px\] { letter-spacing: 2px; }
+        .break-all { word-break: break-all; }
+        .text-white { color: #fff; }
+        .text-transparent { color: transparent; }
+        .text-blue-400 { color: #60a5fa; }
+        .text-neutral-400 { color: #a3a3a3; }
+        .text-neutral-500 { color: #737373; }
+        .text-neutral-600 { color: #525252; }
+        .bg-white\/5 { background-color: rgb(255 255 255 / .05); }
+        .bg-black\/40 { background-color: rgb(0 0 0 / .4); }
+        .bg-blue-600 { background-color: #2563eb; }
+        .bg-gradient-to-r {
+            background-image: linear-gradient(to right, #60a5fa, #2dd4bf);
+        }
+        .bg-clip-text { -webkit-background-clip: text; background-clip: text; }
+        .border { border-width: 1px; }
+        .border-t { border-top-width: 1px; }
+        .border-white\/5 { border-color: rgb(255 255 255 / .05); }
+        .border-white\/10 { border-color: rgb(255 255 255 / .1); }
+        .border-white\/20 { border-color: rgb(255 255 255 / .2); }
+        .rounded { border-radius: .25rem; }
+        .rounded-lg { border-radius: .5rem; }
+        .rounded-xl { border-radius: .75rem; }
+        .rounded-2xl { border-radius: 1rem; }
+        .shadow-lg {
+            box-shadow: 0 10px 15px -3px rgb(30 58 138 / .2),
+                0 4px 6px -4px rgb(30 58 138 / .2);
+        }
+        .shadow-2xl { box-shadow: 0 25px 50px -12px rgb(0 0 0 / .25); }
+        .opacity-0 { opacity: 0; }
+        .appearance-none { appearance: none; }
+        .cursor-pointer { cursor: pointer; }
+        .transition-all, .transition-colors, .transition-transform {
+            transition-timing-function: cubic-bezier(.4, 0, .2, 1);
+            transition-duration: 150ms;
+        }
+        .transition-all { transition-property: all; }
+        .transition-colors {
+            transition-property: color, background-color, border-color;
+        }
+        .transition-transform { transition-property: transform; }
+        .animate-spin { animation: spin 1s linear infinite; }
+        @keyframes spin {
+            to { transform: rotate(360deg); }
+        }
+        .hover\:text-blue-300:hover { color: #93c5fd; }
+        .hover\:text-blue-400:hover { color: #60a5fa; }
+        .hover\:text-neutral-400:hover { color: #a3a3a3; }
+        .hover\:bg-blue-500:hover { background-color: #3b82f6; }
+        .focus\:bg-white\/10:focus { background-color: rgb(255 255 255 / .1); }
+        .active\:scale-95:active { transform: scale(.95); }
+        .group:hover .group-hover\:opacity-100 { opacity: 1; }
+        .group:hover .group-hover\:rotate-45 { transform: rotate(45deg); }
+        .group:hover .group-hover\:text-neutral-200 { color: #e5e5e5; }
+        .peer:checked ~ .peer-checked\:bg-blue-600 { background-color: #2563eb; }
+        .peer:checked ~ .peer-checked\:border-blue-600 { border-color: #2563eb; }
+        @media (min-width: 768px) {
+            .md\:grid-cols-2 { grid-template-columns: repeat(2, minmax(0, 1fr)); }
+        }
+
         body {
-            font-family: 'Inter', sans-serif;
+            font-family: 'Inter', ui-sans-serif, system-ui, -apple-system, 'Segoe UI', Roboto, sans-serif;
             background-color: #050505;
             color: #ededed;
         }
         .glass {
-            background: rgba(255, 255, 255, 0.03);
-            backdrop-filter: blur(12px);
+            background: rgba(20, 20, 28, 0.65);
             border: 1px solid rgba(255, 255, 255, 0.08);
         }
         .glow:hover {
@@ -27,14 +166,19 @@ HTML_TEMPLATE = """
             border-color: #3b82f6;
             box-shadow: 0 0 0 1px #3b82f6;
         }
-        .shimmer {
-            background: linear-gradient(90deg, transparent, rgba(255,255,255,0.05), transparent);
-            background-size: 200% 100%;
-            animation: shimmer 2s infinite;
+        #loader {
+            overflow: hidden;
         }
-        @keyframes shimmer {
-            0% { background-position: -200% 0; }
-            100% { background-position: 200% 0; }
+        .shimmer-inner {
+            width: 50%;
+            height: 100%;
+            background: linear-gradient(90deg, transparent, rgba(255,255,255,0.15), transparent);
+            animation: shimmer-slide 2s linear infinite;
+            will-change: transform;
+        }
+        @keyframes shimmer-slide {
+            from { transform: translateX(-100%); }
+            to { transform: translateX(300%); }
         }
     </style>
 </head>
@@ -52,7 +196,7 @@ HTML_TEMPLATE = """
 
         <!-- Main Card -->
         <div class="glass rounded-2xl p-8 shadow-2xl relative overflow-hidden">
-            <div id="loader" class="hidden absolute top-0 left-0 w-full h-1 shimmer"></div>
+            <div id="loader" class="hidden absolute top-0 left-0 w-full h-1"><div class="shimmer-inner"></div></div>
             
             <form id="dumpForm" class="space-y-6">
                 <!-- User/Repo -->
@@ -75,14 +219,14 @@ HTML_TEMPLATE = """
                     <div class="relative">
                         <input type="password" id="token" placeholder="ghp_..." oninput="updateUri()"
                             class="w-full bg-white/5 border border-white/10 rounded-lg pl-10 pr-4 py-2 text-sm transition-all focus:bg-white/10 font-mono">
-                        <i data-lucide="lock" class="w-4 h-4 text-neutral-500 absolute left-3 top-2.5"></i>
+                        <svg class="w-4 h-4 text-neutral-500 absolute left-3 top-2.5" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" aria-hidden="true"><rect width="18" height="11" x="3" y="11" rx="2" ry="2"/><path d="M7 11V7a5 5 0 0 1 10 0v4"/></svg>
                     </div>
                 </div>
 
                 <!-- Advanced Options Toggle -->
                 <button type="button" onclick="toggleAdvanced()" 
                     class="text-xs text-blue-400 hover:text-blue-300 transition-colors flex items-center gap-1 group">
-                    <i data-lucide="settings-2" class="w-3 h-3 group-hover:rotate-45 transition-transform"></i>
+                    <svg class="w-3 h-3 group-hover:rotate-45 transition-transform" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" aria-hidden="true"><path d="M14 17H5"/><path d="M19 7h-9"/><circle cx="17" cy="17" r="3"/><circle cx="7" cy="7" r="3"/></svg>
                     Advanced Options
                 </button>
 
@@ -134,7 +278,7 @@ HTML_TEMPLATE = """
                             Waiting for input...
                         </div>
                         <button type="button" onclick="copyUri()" class="absolute right-2 top-2 text-neutral-600 hover:text-blue-400 transition-colors opacity-0 group-hover:opacity-100">
-                            <i data-lucide="copy" class="w-4 h-4"></i>
+                            <svg class="w-4 h-4" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" aria-hidden="true"><rect width="14" height="14" x="8" y="8" rx="2" ry="2"/><path d="M4 16c-1.1 0-2-.9-2-2V4c0-1.1.9-2 2-2h10c1.1 0 2 .9 2 2"/></svg>
                         </button>
                     </div>
                 </div>
@@ -142,7 +286,7 @@ HTML_TEMPLATE = """
                 <div class="pt-4">
                     <button type="submit" id="submitBtn"
                         class="w-full bg-blue-600 hover:bg-blue-500 text-white font-semibold py-3 rounded-xl transition-all glow flex items-center justify-center gap-2 shadow-lg shadow-blue-900/20 active:scale-95">
-                        <i data-lucide="download" class="w-4 h-4"></i>
+                        <svg class="w-4 h-4" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" aria-hidden="true"><path d="M12 15V3"/><path d="M21 15v4a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2v-4"/><path d="m7 10 5 5 5-5"/></svg>
                         Generate Dump
                     </button>
                 </div>
@@ -152,19 +296,17 @@ HTML_TEMPLATE = """
         <!-- Footer -->
         <div class="mt-8 flex justify-center gap-6">
             <a href="/docs" class="text-xs text-neutral-600 hover:text-neutral-400 transition-colors flex items-center gap-1">
-                <i data-lucide="book-open" class="w-3 h-3"></i>
+                <svg class="w-3 h-3" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" aria-hidden="true"><path d="M12 5v16"/><path d="M20.001 19A2 2 0 0022 17V5a2 2 0 00-1.999-2L16 3.002A5 5 0 0012 5a5 5 0 00-4-2H4a2 2 0 00-2 2v12a2 2 0 001.999 2H8a5 5 0 014 2 5 5 0 014-2z"/></svg>
                 API Docs
             </a>
             <a href="https://github.com/ramgeart/uithub-local" target="_blank" class="text-xs text-neutral-600 hover:text-neutral-400 transition-colors flex items-center gap-1">
-                <i data-lucide="github" class="w-3 h-3"></i>
+                <svg class="w-3 h-3" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" aria-hidden="true"><path d="M15 22v-4a4.8 4.8 0 0 0-1-3.5c3 0 6-2 6-5.5.08-1.25-.27-2.48-1-3.5.28-1.15.28-2.35 0-3.5 0 0-1 0-3 1.5-2.64-.5-5.36-.5-8 0C6 2 5 2 5 2c-.3 1.15-.3 2.35 0 3.5A5.403 5.403 0 0 0 4 9c0 3.5 3 5.5 6 5.5-.39.49-.68 1.05-.85 1.65-.17.6-.22 1.23-.15 1.85v4"/><path d="M9 18c-4.51 2-5-2-7-2"/></svg>
                 GitHub
             </a>
         </div>
     </div>
 
     <script>
-        lucide.createIcons();
-
         function toggleAdvanced() {
             const adv = document.getElementById('advanced');
             adv.classList.toggle('hidden');
@@ -214,11 +356,24 @@ HTML_TEMPLATE = """
             const exclude = document.getElementById('exclude').value;
             const exclude_comments = document.getElementById('exclude_comments').checked;
             const not_ignore = document.getElementById('not_ignore').checked;
+            const ext = format === 'json' ? 'json' : (format === 'html' ? 'html' : 'txt');
+            const filename = `${repo}_dump.${ext}`;
+
+            // Ask for the destination while the click still counts as a user
+            // gesture; the response is then piped straight to disk.
+            let fileHandle = null;
+            if (window.showSaveFilePicker) {
+                try {
+                    fileHandle = await window.showSaveFilePicker({ suggestedName: filename });
+                } catch (err) {
+                    if (err.name === 'AbortError') return;
+                }
+            }
 
+            const idleLabel = submitBtn.innerHTML;
             submitBtn.disabled = true;
-            submitBtn.innerHTML = '<i data-lucide="loader-2" class="w-4 h-4 animate-spin"></i> Processing...';
+            submitBtn.innerHTML = '<svg class="w-4 h-4 animate-spin" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" aria-hidden="true"><path d="M21 12a9 9 0 1 1-6.219-8.56"/></svg> Processing...';
             loader.classList.remove('hidden');
-            lucide.createIcons();
 
             try {
                 const url = new URL(`/dump/${user}/${repo}`, window.location.origin);
@@ -233,14 +388,19 @@ HTML_TEMPLATE = """
                 const response = await fetch(url);
                 if (!response.ok) throw new Error(await response.text());
 
-                // For downloads
+                if (fileHandle) {
+                    const writable = await fileHandle.createWritable();
+                    await response.body.pipeTo(writable);
+                    return;
+                }
+
+                // Fallback: buffer the dump and hand it to a download link
                 const blob = await response.blob();
                 const downloadUrl = window.URL.createObjectURL(blob);
                 const a = document.createElement('a');
                 a.style.display = 'none';
                 a.href = downloadUrl;
-                const ext = format === 'json' ? 'json' : (format === 'html' ? 'html' : 'txt');
-                a.download = `${repo}_dump.${ext}`;
+                a.download = filename;
                 document.body.appendChild(a);
                 a.click();
                 window.URL.revokeObjectURL(downloadUrl);
@@ -248,9 +408,8 @@ HTML_TEMPLATE = """
                 alert('Error: ' + err.message);
             } finally {
                 submitBtn.disabled = false;
-                submitBtn.innerHTML = '<i data-lucide="download" class="w-4 h-4"></i> Generate Dump';
+                submitBtn.innerHTML = idleLabel;
                 loader.classList.add('hidden');
-                lucide.createIcons();
             }
         };
 
@@ -260,3 +419,24 @@ HTML_TEMPLATE = """
 </body>
 </html>
 """
+
+
+_HTML_COMMENT = re.compile(r"<!--.*?-->", re.S)
+_INTER_TAG_WS = re.compile(r">\s+<")
+_INDENT = re.compile(r"\n\s+")
+
+
+def _minify_html(markup: str) -> str:
+    """Drop comments and indentation from *markup*.
+
+    Only whitespace between tags and at line starts is touched, which is safe
+    for this page: it has no ``<pre>`` blocks or multi-line JS strings.
+    """
+    markup = _HTML_COMMENT.sub("", markup)
+    markup = _INTER_TAG_WS.sub("><", markup)
+    return _INDENT.sub("\n", markup).strip()
+
+
+# Encoded and compressed once at import so requests just send bytes.
+HTML_BYTES = _minify_html(HTML_TEMPLATE).encode("utf-8")
+HTML_GZIP = gzip.compress(HTML_BYTES, compresslevel=9, mtime=0)
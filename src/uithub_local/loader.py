@@ -2,26 +2,54 @@
 
 from __future__ import annotations
 
+import os
 from pathlib import Path
 
 from .utils import strip_comments
 
+# Leading bytes inspected for NUL before the rest of the file is read.
+SNIFF_BYTES = 4096
 
-def load_text(path: Path, *, exclude_comments: bool = False) -> str:
+
+def _decode(raw: bytes) -> str:
+    try:
+        return str(raw, "utf-8")
+    except UnicodeDecodeError:
+        return str(raw, "utf-8", "replace")
+
+
+def load_text(
+    path: Path,
+    *,
+    exclude_comments: bool = False,
+    max_bytes: int | None = None,
+) -> str:
     """Return text of *path* with UTF-8 fallback.
 
+    The file is read once. Files larger than *max_bytes*, or whose first
+    ``SNIFF_BYTES`` contain a NUL byte, are treated as binary and yield ``""``.
+
     Args:
         path: Path to the file.
         exclude_comments: If True, strip comments from the content.
+        max_bytes: Optional size cap in bytes; by default files of any size
+            are loaded.
 
     Returns:
         File content, optionally with comments removed.
     """
 
-    try:
-        content = path.read_text(encoding="utf-8")
-    except UnicodeDecodeError:
-        content = path.read_text(encoding="utf-8", errors="replace")
+    with path.open("rb") as fh:
+        size = os.fstat(fh.fileno()).st_size
+        if max_bytes is not None and size > max_bytes:
+            return ""
+        head = fh.read(SNIFF_BYTES)
+        if b"\x00" in head:
+            return ""
+        content = _decode(head + fh.read())
+    # Match the universal-newline translation ``Path.read_text`` used to do.
+    if "\r" in content:
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
 
     if exclude_comments:
         content = strip_comments(content, path)
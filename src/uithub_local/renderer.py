@@ -2,34 +2,347 @@
 
 from __future__ import annotations
 
+import gzip
+import hashlib
+import io
 import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import partial
+from itertools import accumulate, islice
 from pathlib import Path
-from typing import List, Tuple
-import html
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Final,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+try:
+    import orjson
+except Exception:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import brotli
+except Exception:  # pragma: no cover - optional dependency
+    brotli = None
 
 from .loader import load_text
-from .tokenizer import approximate_tokens
+from .tokenizer import approximate_tokens, approximate_tokens_batch
 from .walker import FileInfo
 
+__all__ = ["Dump", "FileDump", "compress", "render", "render_iter", "render_split"]
+
+# Same replacements as ``html.escape(quote=True)``, applied in a single pass.
+_HTML_ESCAPES: Final = str.maketrans(
+    {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#x27;"}
+)
+_NEEDS_ESCAPE = re.compile(r"[&<>\"']")
+
+_CSS_WS = re.compile(r"\s+")
+_CSS_PUNCT_WS = re.compile(r"\s*([{};:,>])\s*")
+
+
+def _json_string(value: str) -> str:
+    """Encode *value* exactly as ``json.dumps`` does, via orjson when it can.
+
+    orjson writes non-ASCII characters and DEL raw where the stdlib escapes
+    them, so it only handles the ASCII text that both encode alike.
+    """
+    if orjson is not None and value.isascii() and "\x7f" not in value:
+        try:
+            return orjson.dumps(value).decode()
+        except TypeError:  # pragma: no cover - ASCII text always encodes
+            pass
+    return json.dumps(value)
+
+
+def _minify_css(css: str) -> str:
+    """Collapse whitespace in *css*, dropping it around punctuation."""
+    return _CSS_PUNCT_WS.sub(r"\1", _CSS_WS.sub(" ", css)).strip()
+
+
+# Stylesheet embedded by ``as_html``, minified once at import time.
+_HTML_STYLE: Final[str] = _minify_css(
+    """
+<style>
+html {
+    font-size:14px;
+    font-family:ui-monospace, SFMono-Regular, Menlo, monospace;
+}
+body {
+    margin:0;
+    background:#0d1117;
+    color:#c9d1d9;
+}
+.container {
+    max-width:1100px;
+    padding:2rem;
+    margin:0 auto;
+    display:flex;
+    flex-direction:column;
+    gap:1rem;
+}
+.header-card, details.file-card {
+    border:1px solid #30363d;
+    border-radius:6px;
+    box-shadow:0 2px 4px rgba(0,0,0,.6);
+    background:#161b22;
+}
+.header-card {
+    padding:1rem 1.25rem;
+}
+.header-card h1 {
+    margin:0 0 .5rem;
+    font-size:1.25rem;
+}
+.header-card p {
+    margin:0;
+    color:#8b949e;
+    font-size:.9rem;
+}
+details.file-card summary {
+    display:flex;
+    align-items:center;
+    gap:.75rem;
+    padding:.8rem 1rem;
+    cursor:pointer;
+    background:#161b22;
+    color:inherit;
+    list-style:none;
+}
+details.file-card summary:hover {
+    background:#21262d;
+}
+details.file-card summary::-webkit-details-marker {display:none;}
+.chevron {
+    fill:#58a6ff;
+    transition:transform .15s;
+    flex:none;
+}
+@media (prefers-reduced-motion: reduce) {
+    .chevron {transition:none;}
+}
+details.file-card[open] > summary .chevron {
+    transform:rotate(90deg);
+}
+summary:focus-visible {
+    outline:2px solid #58a6ff;
+    outline-offset:2px;
+}
+.path {
+    font-weight:bold;
+    flex:1;
+    overflow:hidden;
+    text-overflow:ellipsis;
+    white-space:nowrap;
+    direction:rtl;
+}
+.badge {
+    font-size:.7rem;
+    background:#238636;
+    color:#fff;
+    padding:.15rem .45rem;
+    border-radius:9999px;
+}
+details.file-card pre {
+    background:#0d1117;
+    padding:1rem 1.25rem;
+    margin:0;
+    overflow:auto;
+    line-height:1.45;
+    white-space:pre;
+    border-top:1px solid #30363d;
+    border-radius:0 0 6px 6px;
+    background-image:linear-gradient(transparent 97%,
+        rgba(255,255,255,.05) 97%);
+    background-size:100% 1.6em;
+}
+@media (max-width:600px) {
+    .container {padding:1rem;}
+}
+</style>
+"""
+)
+
+# Below this many files the pool's start-up cost outweighs overlapping reads.
+_PARALLEL_LOAD_MIN = 16
+# Files read ahead of the tokenizer when loading in parallel.
+_READ_AHEAD = 64
+# Files whose contents are handed to the tokenizer in one batch.
+_TOKENIZE_BATCH = 32
+
+# Recently built Dumps, so repeat renders (e.g. another format) skip loading.
+# Entries can be large, hence the small bound.
+_DUMP_CACHE_SIZE = 8
+_DUMP_CACHE_TTL = 300.0
+_DumpKey = Tuple[str, bytes, Optional[int], bool]
+_DUMP_CACHE: OrderedDict[_DumpKey, Tuple[float, Dump]] = OrderedDict()
+_DUMP_CACHE_LOCK = threading.Lock()
+
+
+def _read_content(path: Path, exclude_comments: bool) -> str:
+    """Load *path* for dumping, or return ``""`` if it cannot be read."""
+    try:
+        # The walker has already applied the caller's size limit.
+        return load_text(path, exclude_comments=exclude_comments)
+    except Exception:
+        return ""
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compress *data* for an HTTP ``Content-Encoding`` of ``gzip`` or ``br``.
+
+    Brotli requires the optional ``brotli`` package; quality 4 is close to the
+    best ratio for text at a fraction of the cost.
+
+    Raises:
+        ValueError: If *encoding* is not supported here.
+    """
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(data, quality=4)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def _collect(pieces: Iterable[str]) -> str:
+    """Concatenate rendered *pieces* without materialising them as a list."""
+    buf = io.StringIO()
+    buf.writelines(pieces)
+    return buf.getvalue()
+
+
+def _content_hash(content: str) -> bytes:
+    """Return a short digest identifying *content*."""
+    return hashlib.blake2b(
+        content.encode("utf-8", "surrogatepass"), digest_size=8
+    ).digest()
+
 
 class FileDump:
-    """A file plus its loaded contents and token count."""
+    """A file plus its loaded contents and token count.
+
+    When several FileDumps share a *blobs* mapping, files with identical
+    content share one string object and are only tokenized once. *content*
+    may be passed in when the file has already been read elsewhere, and
+    *tokens* when it has already been counted.
+    """
 
     def __init__(
-        self, info: FileInfo, root: Path, exclude_comments: bool = False
+        self,
+        info: FileInfo,
+        root: Path,
+        exclude_comments: bool = False,
+        blobs: Dict[bytes, Tuple[str, int]] | None = None,
+        content: str | None = None,
+        tokens: int | None = None,
     ) -> None:
         self.path = info.path
+        self.path_posix = info.path.as_posix()
+        self.escaped_path = self.path_posix.translate(_HTML_ESCAPES)
         self.full_path = root / info.path
         self.size = info.size
         self.tokens = 0
-        self.content = ""
-        try:
-            self.content = load_text(self.full_path, exclude_comments=exclude_comments)
-            self.tokens = approximate_tokens(self.content)
-        except Exception:
-            self.content = ""
-            self.tokens = 0
+        if content is None:
+            content = _read_content(self.full_path, exclude_comments)
+        self.content = content
+        self.content_hash = _content_hash(self.content)
+        seen = blobs.get(self.content_hash) if blobs is not None else None
+        if seen is not None:
+            self.content, self.tokens = seen
+        else:
+            if tokens is not None:
+                self.tokens = tokens
+            else:
+                try:
+                    self.tokens = approximate_tokens(self.content)
+                except Exception:
+                    self.tokens = 0
+            if blobs is not None:
+                blobs.setdefault(self.content_hash, (self.content, self.tokens))
+        self._escaped_html: str | None = None
+
+    @property
+    def escaped_html(self) -> str:
+        """HTML-escaped ``content``, computed on first use and then reused."""
+        if self._escaped_html is None:
+            content = self.content
+            # Most source has nothing to escape; reuse the string as-is then.
+            if _NEEDS_ESCAPE.search(content) is None:
+                self._escaped_html = content
+            else:
+                self._escaped_html = content.translate(_HTML_ESCAPES)
+        return self._escaped_html
+
+
+def _load_file_dumps(
+    files: List[FileInfo], root: Path, exclude_comments: bool
+) -> List[FileDump]:
+    """Build a FileDump per entry of *files*, preserving order.
+
+    Larger file sets are read on a thread pool (``read()`` releases the GIL)
+    while this thread tokenizes whatever has already arrived, in batches of
+    ``_TOKENIZE_BATCH``, so reading and tokenizing overlap. At most
+    ``_READ_AHEAD`` files are buffered.
+    """
+    blobs: Dict[bytes, Tuple[str, int]] = {}
+    if len(files) < _PARALLEL_LOAD_MIN:
+        return [
+            FileDump(info, root, exclude_comments=exclude_comments, blobs=blobs)
+            for info in files
+        ]
+    cpus = os.cpu_count() or 1
+    read = partial(_read_content, exclude_comments=exclude_comments)
+    with ThreadPoolExecutor(max_workers=min(32, cpus * 4)) as pool:
+        paths = [root / info.path for info in files]
+        contents = _read_ahead(pool, read, paths, _READ_AHEAD)
+        dumps: List[FileDump] = []
+        loaded = zip(files, contents)
+        while batch := list(islice(loaded, _TOKENIZE_BATCH)):
+            # Identical contents within a batch are only counted once.
+            unique = list(dict.fromkeys(content for _, content in batch))
+            counts = dict(zip(unique, approximate_tokens_batch(unique)))
+            dumps.extend(
+                FileDump(
+                    info,
+                    root,
+                    exclude_comments,
+                    blobs=blobs,
+                    content=content,
+                    tokens=counts[content],
+                )
+                for info, content in batch
+            )
+        return dumps
+
+
+def _read_ahead(
+    pool: ThreadPoolExecutor,
+    fn: Callable[[Path], str],
+    items: Iterable[Path],
+    depth: int,
+) -> Iterator[str]:
+    """Yield ``fn(item)`` in order, keeping up to *depth* calls in flight."""
+    pending: Deque[Future[str]] = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= depth:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
 
 
 class Dump:
@@ -41,235 +354,289 @@ class Dump:
         exclude_comments: bool = False,
     ) -> None:
         self.root = root
-        self.file_dumps: List[FileDump] = [
-            FileDump(info, root, exclude_comments=exclude_comments) for info in files
-        ]
+        # One timestamp per Dump, so every rendering and split part agrees.
+        self.timestamp = datetime.now(timezone.utc).isoformat()
+        self.file_dumps: List[FileDump] = _load_file_dumps(
+            files, root, exclude_comments
+        )
         self.total_tokens = sum(fd.tokens for fd in self.file_dumps)
         if max_tokens is not None and self.total_tokens > max_tokens:
             self._truncate(max_tokens)
+        # _cum_tokens[i] is the token count of file_dumps[:i].
+        self._cum_tokens = list(
+            accumulate((fd.tokens for fd in self.file_dumps), initial=0)
+        )
 
     def _truncate(self, limit: int) -> None:
-        self.file_dumps.sort(key=lambda f: (f.tokens, f.path.as_posix()), reverse=True)
-        while self.total_tokens > limit and self.file_dumps:
-            victim = self.file_dumps.pop(0)
-            self.total_tokens -= victim.tokens
+        self.file_dumps.sort(key=lambda f: (f.tokens, f.path_posix), reverse=True)
+        # Drop the largest files first: find the shortest prefix whose removal
+        # brings the total under ``limit`` and cut it off with one slice.
+        total = self.total_tokens
+        cut = 0
+        for fd in self.file_dumps:
+            if total <= limit:
+                break
+            total -= fd.tokens
+            cut += 1
+        del self.file_dumps[:cut]
+        self.total_tokens = total
+
+    def _split_bounds(self, split_tokens: int) -> List[Tuple[int, int]]:
+        """Return ``(start, end)`` index pairs for :meth:`split_by_tokens`.
+
+        Each chunk is the longest run from ``start`` that fits in
+        *split_tokens*, found by bisecting the prefix sums; a single file
+        larger than the limit gets a chunk of its own.
+        """
+        cum = self._cum_tokens
+        count = len(self.file_dumps)
+        bounds: List[Tuple[int, int]] = []
+        start = 0
+        while start < count:
+            end = bisect_right(cum, cum[start] + split_tokens, start + 1) - 1
+            end = max(end, start + 1)
+            bounds.append((start, end))
+            start = end
+        return bounds
 
     def split_by_tokens(self, split_tokens: int) -> List[List[FileDump]]:
         """Split file_dumps into chunks, each with approximately split_tokens tokens."""
         if split_tokens <= 0:
             return [self.file_dumps]
-
-        chunks: List[List[FileDump]] = []
-        current_chunk: List[FileDump] = []
-        current_tokens = 0
-
-        for fd in self.file_dumps:
-            # If adding this file would exceed the limit and we already
-            # have files in the chunk
-            if current_tokens + fd.tokens > split_tokens and current_chunk:
-                chunks.append(current_chunk)
-                current_chunk = []
-                current_tokens = 0
-
-            current_chunk.append(fd)
-            current_tokens += fd.tokens
-
-        # Add the last chunk if it has any files
-        if current_chunk:
-            chunks.append(current_chunk)
-
+        chunks = [self.file_dumps[a:b] for a, b in self._split_bounds(split_tokens)]
         return chunks if chunks else [[]]
 
-    def as_text(self, repo_name: str, file_dumps: List[FileDump] | None = None) -> str:
+    def _chunk_tokens(
+        self, file_dumps: List[FileDump], chunk_tokens: int | None
+    ) -> int:
+        if chunk_tokens is not None:
+            return chunk_tokens
+        if file_dumps is self.file_dumps:
+            return self.total_tokens
+        return sum(fd.tokens for fd in file_dumps)
+
+    def as_text(
+        self,
+        repo_name: str,
+        file_dumps: List[FileDump] | None = None,
+        *,
+        chunk_tokens: int | None = None,
+    ) -> str:
         """Render as text format.
 
         Args:
             repo_name: Name of the repository.
             file_dumps: Optional list of FileDump objects.
                 If None, uses self.file_dumps.
+            chunk_tokens: Token total of *file_dumps* when already known.
         """
+        return _collect(
+            self.iter_text(repo_name, file_dumps, chunk_tokens=chunk_tokens)
+        )
+
+    def iter_text(
+        self,
+        repo_name: str,
+        file_dumps: List[FileDump] | None = None,
+        *,
+        chunk_tokens: int | None = None,
+    ) -> Iterator[str]:
+        """Yield the text rendering piece by piece; see :meth:`as_text`."""
         if file_dumps is None:
             file_dumps = self.file_dumps
-        timestamp = datetime.now(timezone.utc).isoformat()
-        chunk_tokens = sum(fd.tokens for fd in file_dumps)
-        lines = [f"# Uithub-local dump – {repo_name} – {timestamp}"]
-        lines.append(f"# ≈ {chunk_tokens} tokens")
+        timestamp = self.timestamp
+        chunk_tokens = self._chunk_tokens(file_dumps, chunk_tokens)
+        yield f"# Uithub-local dump – {repo_name} – {timestamp}\n"
+        yield f"# ≈ {chunk_tokens} tokens"
         for fd in file_dumps:
-            lines.append(f"\n### {fd.path.as_posix()}")
-            lines.append(fd.content)
-        lines.append("")
-        return "\n".join(lines)
+            yield f"\n\n### {fd.path_posix}\n"
+            yield fd.content
+        yield "\n"
 
-    def as_json(self, repo_name: str, file_dumps: List[FileDump] | None = None) -> str:
+    def as_json(
+        self,
+        repo_name: str,
+        file_dumps: List[FileDump] | None = None,
+        *,
+        dedupe: bool = False,
+        chunk_tokens: int | None = None,
+    ) -> str:
         """Render as JSON format.
 
         Args:
             repo_name: Name of the repository.
             file_dumps: Optional list of FileDump objects.
                 If None, uses self.file_dumps.
+            dedupe: Store each distinct content once in a top-level
+                ``"blobs"`` map and point files at it via ``"contents_ref"``.
+            chunk_tokens: Token total of *file_dumps* when already known.
+        """
+        return _collect(
+            self.iter_json(
+                repo_name, file_dumps, dedupe=dedupe, chunk_tokens=chunk_tokens
+            )
+        )
+
+    def iter_json(
+        self,
+        repo_name: str,
+        file_dumps: List[FileDump] | None = None,
+        *,
+        dedupe: bool = False,
+        chunk_tokens: int | None = None,
+    ) -> Iterator[str]:
+        """Yield the JSON rendering one file entry at a time.
+
+        The pieces join to exactly ``json.dumps(obj, indent=2)`` of the whole
+        document, without ever holding that document in memory.
         """
         if file_dumps is None:
             file_dumps = self.file_dumps
-        chunk_tokens = sum(fd.tokens for fd in file_dumps)
-        obj = {
-            "repo": repo_name,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "total_tokens": chunk_tokens,
-            "files": [
-                {
-                    "path": fd.path.as_posix(),
-                    "contents": fd.content,
-                    "tokens": fd.tokens,
-                }
-                for fd in file_dumps
-            ],
-        }
-        return json.dumps(obj, indent=2)
-
-    def as_html(self, repo_name: str, file_dumps: List[FileDump] | None = None) -> str:
+        chunk_tokens = self._chunk_tokens(file_dumps, chunk_tokens)
+        timestamp = self.timestamp
+        yield (
+            "{\n"
+            f'  "repo": {_json_string(repo_name)},\n'
+            f'  "timestamp": {_json_string(timestamp)},\n'
+            f'  "total_tokens": {chunk_tokens},\n'
+            '  "files": ['
+        )
+        blobs: Dict[str, str] = {}
+        sep = "\n"
+        for fd in file_dumps:
+            if dedupe:
+                ref = fd.content_hash.hex()
+                blobs.setdefault(ref, fd.content)
+                contents = f'"contents_ref": "{ref}"'
+            else:
+                contents = f'"contents": {_json_string(fd.content)}'
+            yield (
+                f"{sep}    {{\n"
+                f'      "path": {_json_string(fd.path_posix)},\n'
+                f"      {contents},\n"
+                f'      "tokens": {fd.tokens}\n'
+                "    }"
+            )
+            sep = ",\n"
+        yield "\n  ]" if file_dumps else "]"
+        if dedupe:
+            yield ',\n  "blobs": {'
+            sep = "\n"
+            for ref, content in blobs.items():
+                yield f'{sep}    "{ref}": {_json_string(content)}'
+                sep = ",\n"
+            yield "\n  }" if blobs else "}"
+        yield "\n}"
+
+    def as_html(
+        self,
+        repo_name: str,
+        file_dumps: List[FileDump] | None = None,
+        *,
+        chunk_tokens: int | None = None,
+    ) -> str:
         """Render as HTML format.
 
         Args:
             repo_name: Name of the repository.
             file_dumps: Optional list of FileDump objects.
                 If None, uses self.file_dumps.
+            chunk_tokens: Token total of *file_dumps* when already known.
         """
+        return _collect(
+            self.iter_html(repo_name, file_dumps, chunk_tokens=chunk_tokens)
+        )
+
+    def iter_html(
+        self,
+        repo_name: str,
+        file_dumps: List[FileDump] | None = None,
+        *,
+        chunk_tokens: int | None = None,
+    ) -> Iterator[str]:
+        """Yield the HTML rendering piece by piece; see :meth:`as_html`."""
         if file_dumps is None:
             file_dumps = self.file_dumps
-        chunk_tokens = sum(fd.tokens for fd in file_dumps)
-        timestamp = datetime.now(timezone.utc).isoformat()
-        style = """
-        <style>
-        html {
-            font-size:14px;
-            font-family:ui-monospace, SFMono-Regular, Menlo, monospace;
-        }
-        body {
-            margin:0;
-            background:#0d1117;
-            color:#c9d1d9;
-        }
-        .container {
-            max-width:1100px;
-            padding:2rem;
-            margin:0 auto;
-            display:flex;
-            flex-direction:column;
-            gap:1rem;
-        }
-        .header-card, details.file-card {
-            border:1px solid #30363d;
-            border-radius:6px;
-            box-shadow:0 2px 4px rgba(0,0,0,.6);
-            background:#161b22;
-        }
-        .header-card {
-            padding:1rem 1.25rem;
-        }
-        .header-card h1 {
-            margin:0 0 .5rem;
-            font-size:1.25rem;
-        }
-        .header-card p {
-            margin:0;
-            color:#8b949e;
-            font-size:.9rem;
-        }
-        details.file-card summary {
-            display:flex;
-            align-items:center;
-            gap:.75rem;
-            padding:.8rem 1rem;
-            cursor:pointer;
-            background:#161b22;
-            color:inherit;
-            list-style:none;
-        }
-        details.file-card summary:hover {
-            background:#21262d;
-        }
-        details.file-card summary::-webkit-details-marker {display:none;}
-        .chevron {
-            fill:#58a6ff;
-            transition:transform .15s;
-            flex:none;
-        }
-        @media (prefers-reduced-motion: reduce) {
-            .chevron {transition:none;}
-        }
-        details.file-card[open] > summary .chevron {
-            transform:rotate(90deg);
-        }
-        summary:focus-visible {
-            outline:2px solid #58a6ff;
-            outline-offset:2px;
-        }
-        .path {
-            font-weight:bold;
-            flex:1;
-            overflow:hidden;
-            text-overflow:ellipsis;
-            white-space:nowrap;
-            direction:rtl;
-        }
-        .badge {
-            font-size:.7rem;
-            background:#238636;
-            color:#fff;
-            padding:.15rem .45rem;
-            border-radius:9999px;
-        }
-        details.file-card pre {
-            background:#0d1117;
-            padding:1rem 1.25rem;
-            margin:0;
-            overflow:auto;
-            line-height:1.45;
-            white-space:pre;
-            border-top:1px solid #30363d;
-            border-radius:0 0 6px 6px;
-            background-image:linear-gradient(transparent 97%,
-                rgba(255,255,255,.05) 97%);
-            background-size:100% 1.6em;
-        }
-        @media (max-width:600px) {
-            .container {padding:1rem;}
-        }
-        </style>
-        """
-        lines = [
-            "<!DOCTYPE html>",
-            '<html lang="en">',
-            "<head>",
-            '<meta charset="UTF-8">',
-            '<meta name="viewport" content="width=device-width,initial-scale=1">',
-            f"<title>{repo_name} dump</title>",
-            style,
-            "</head>",
-            "<body>",
-            "<div class='container'>",
-            "<div class='header-card'>",
-            f"<h1>Uithub-local dump – {repo_name}</h1>",
-            f"<p>{timestamp} \u00b7 \u2248 {chunk_tokens} tokens</p>",
-            "</div>",
-        ]
+        chunk_tokens = self._chunk_tokens(file_dumps, chunk_tokens)
+        timestamp = self.timestamp
+        yield "\n".join(
+            [
+                "<!DOCTYPE html>",
+                '<html lang="en">',
+                "<head>",
+                '<meta charset="UTF-8">',
+                '<meta name="viewport" content="width=device-width,initial-scale=1">',
+                f"<title>{repo_name} dump</title>",
+                _HTML_STYLE,
+                "</head>",
+                "<body>",
+                "<div class='container'>",
+                "<div class='header-card'>",
+                f"<h1>Uithub-local dump – {repo_name}</h1>",
+                f"<p>{timestamp} \u00b7 \u2248 {chunk_tokens} tokens</p>",
+                "</div>",
+            ]
+        )
         for fd in file_dumps:
-            path = html.escape(fd.path.as_posix())
-            lines.append("<details class='file-card'>")
-            lines.append(
+            yield (
+                "\n<details class='file-card'>\n"
                 "<summary>"
                 "<svg class='chevron' width='10' height='10'"
                 " viewBox='0 0 8 8' aria-hidden='true'>"
                 "<path d='M0 0 L6 4 L0 8z'/></svg>"
-                f"<span class='path'>{path}</span>"
-                "</summary>"
+                f"<span class='path'>{fd.escaped_path}</span>"
+                "</summary>\n"
+                "<pre><code>\n"
             )
-            lines.append("<pre><code>")
-            lines.append(html.escape(fd.content))
-            lines.append("</code></pre>")
-            lines.append("</details>")
-        lines.append("</div></body></html>")
-        return "\n".join(lines)
+            yield fd.escaped_html
+            yield "\n</code></pre>\n</details>"
+        yield "\n</div></body></html>"
+
+
+def _manifest_key(
+    files: List[FileInfo], root: Path, max_tokens: int | None, exclude_comments: bool
+) -> _DumpKey:
+    """Identify a Dump by its root, file manifest and load options."""
+    manifest = hashlib.blake2b(digest_size=16)
+    for info in sorted(files, key=lambda f: f.path.as_posix()):
+        entry = (
+            f"{info.path.as_posix()}\0{info.size}\0{info.mtime}\0"
+            f"{info.mtime_ns}\0{info.ctime_ns}\0{info.ino}\n"
+        )
+        manifest.update(entry.encode("utf-8", "surrogatepass"))
+    return (str(root.resolve()), manifest.digest(), max_tokens, exclude_comments)
+
+
+def _cached_dump(
+    files: List[FileInfo],
+    root: Path,
+    max_tokens: int | None,
+    exclude_comments: bool,
+    reuse: bool = True,
+) -> Dump:
+    """Return a Dump for these inputs, reusing a recent one when unchanged.
+
+    Entries are keyed on every file's path, size, nanosecond mtime and ctime
+    and inode, so any edit is a miss. A reused Dump keeps the timestamp of
+    when its files were loaded. Without *reuse* (for throwaway roots such as
+    a downloaded archive) a fresh Dump is built and nothing is cached.
+    """
+    if not reuse:
+        return Dump(files, root, max_tokens, exclude_comments=exclude_comments)
+    key = _manifest_key(files, root, max_tokens, exclude_comments)
+    now = time.monotonic()
+    with _DUMP_CACHE_LOCK:
+        hit = _DUMP_CACHE.get(key)
+        if hit is not None and now - hit[0] < _DUMP_CACHE_TTL:
+            _DUMP_CACHE.move_to_end(key)
+            return hit[1]
+    dump = Dump(files, root, max_tokens, exclude_comments=exclude_comments)
+    with _DUMP_CACHE_LOCK:
+        _DUMP_CACHE[key] = (now, dump)
+        _DUMP_CACHE.move_to_end(key)
+        while len(_DUMP_CACHE) > _DUMP_CACHE_SIZE:
+            _DUMP_CACHE.popitem(last=False)
+    return dump
 
 
 def render(
@@ -279,17 +646,44 @@ def render(
     max_tokens: int | None = None,
     fmt: str = "text",
     exclude_comments: bool = False,
+    dedupe: bool = False,
+    reuse: bool = True,
 ) -> str:
-    dump = Dump(files, root, max_tokens, exclude_comments=exclude_comments)
+    dump = _cached_dump(files, root, max_tokens, exclude_comments, reuse)
     resolved = root.resolve()
     repo_name = resolved.name or resolved.parent.name
     if fmt == "json":
-        return dump.as_json(repo_name)
+        return dump.as_json(repo_name, dedupe=dedupe)
     if fmt == "html":
         return dump.as_html(repo_name)
     return dump.as_text(repo_name)
 
 
+def render_iter(
+    files: List[FileInfo],
+    root: Path,
+    *,
+    max_tokens: int | None = None,
+    fmt: str = "text",
+    exclude_comments: bool = False,
+    dedupe: bool = False,
+    reuse: bool = True,
+) -> Iterator[str]:
+    """Return the same output as :func:`render` as an iterator of pieces.
+
+    File contents are loaded before this returns, so *root* may be removed
+    while the pieces are still being consumed.
+    """
+    dump = _cached_dump(files, root, max_tokens, exclude_comments, reuse)
+    resolved = root.resolve()
+    repo_name = resolved.name or resolved.parent.name
+    if fmt == "json":
+        return dump.iter_json(repo_name, dedupe=dedupe)
+    if fmt == "html":
+        return dump.iter_html(repo_name)
+    return dump.iter_text(repo_name)
+
+
 def render_split(
     files: List[FileInfo],
     root: Path,
@@ -298,6 +692,8 @@ def render_split(
     max_tokens: int | None = None,
     fmt: str = "text",
     exclude_comments: bool = False,
+    dedupe: bool = False,
+    reuse: bool = True,
 ) -> List[Tuple[str, str]]:
     """Render repository into multiple outputs split by token count.
 
@@ -308,30 +704,41 @@ def render_split(
         max_tokens: Optional hard cap on total tokens (applied before splitting).
         fmt: Output format ("text", "json", or "html").
         exclude_comments: Whether to strip code comments.
+        dedupe: Store repeated contents once per JSON part; see
+            :meth:`Dump.as_json`.
+        reuse: Allow a cached Dump of the same files; see :func:`_cached_dump`.
 
     Returns:
         List of (filename, content) tuples for each chunk.
     """
-    dump = Dump(files, root, max_tokens, exclude_comments=exclude_comments)
+    dump = _cached_dump(files, root, max_tokens, exclude_comments, reuse)
     resolved = root.resolve()
     repo_name = resolved.name or resolved.parent.name
 
     # Get file extension based on format
     ext = {"text": "txt", "json": "json", "html": "html"}.get(fmt, "txt")
 
-    # Split into chunks
-    chunks = dump.split_by_tokens(split_tokens)
+    # Split into chunks; prefix sums give each chunk's token total directly
+    if split_tokens > 0:
+        bounds = dump._split_bounds(split_tokens) or [(0, 0)]
+    else:
+        bounds = [(0, len(dump.file_dumps))]
+    cum = dump._cum_tokens
 
     # Generate outputs for each chunk
     outputs: List[Tuple[str, str]] = []
-    for idx, chunk in enumerate(chunks, start=1):
+    for idx, (start, end) in enumerate(bounds, start=1):
+        chunk = dump.file_dumps[start:end]
+        tokens = cum[end] - cum[start]
         filename = f"{repo_name}_{idx}.{ext}"
         if fmt == "json":
-            content = dump.as_json(repo_name, chunk)
+            content = dump.as_json(
+                repo_name, chunk, dedupe=dedupe, chunk_tokens=tokens
+            )
         elif fmt == "html":
-            content = dump.as_html(repo_name, chunk)
+            content = dump.as_html(repo_name, chunk, chunk_tokens=tokens)
         else:
-            content = dump.as_text(repo_name, chunk)
+            content = dump.as_text(repo_name, chunk, chunk_tokens=tokens)
         outputs.append((filename, content))
 
     return outputs
@@ -1,31 +1,203 @@
 from __future__ import annotations
 
-import yaml
+import asyncio
+import hashlib
+import itertools
+import json
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import List, Optional, Any
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-from fastapi import FastAPI, HTTPException, Depends, Query
-from fastapi.responses import Response, JSONResponse, HTMLResponse
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request
+from fastapi.responses import Response, JSONResponse, HTMLResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
-from .api import dump_repo, dump_repo_split
+from .api import _looks_remote, dump_repo, dump_repo_iter, dump_repo_split
+from .renderer import brotli, compress, orjson
 from .walker import DEFAULT_MAX_SIZE
-from .gui import HTML_TEMPLATE
+from .gui import HTML_BYTES, HTML_GZIP
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    # Build the OpenAPI document before serving so no request pays for it.
+    _openapi_yaml()
+    yield
+
 
 app = FastAPI(
     title="uithub-local API",
     description="REST API for uithub-local to flatten repositories into text dumps.",
     version="0.1.8",
+    lifespan=_lifespan,
 )
 
 @app.get("/", response_class=HTMLResponse, include_in_schema=False)
-async def serve_gui():
-    return HTML_TEMPLATE
+async def serve_gui(request: Request):
+    headers = {"Vary": "Accept-Encoding"}
+    encoding = _pick_encoding(request.headers.get("accept-encoding", ""))
+    if encoding in _GUI_ENCODED:
+        headers["Content-Encoding"] = encoding
+        return Response(
+            content=_GUI_ENCODED[encoding], media_type="text/html", headers=headers
+        )
+    return Response(content=HTML_BYTES, media_type="text/html", headers=headers)
 
 security = HTTPBearer(auto_error=False)
 
+# Bodies smaller than this are not worth compressing.
+_MIN_COMPRESS_SIZE = 1024
+
+
+def _pick_encoding(accept_encoding: str) -> Optional[str]:
+    """Return the best encoding offered by *accept_encoding*, if any."""
+    offered = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        offered[name.strip().lower()] = q
+    for encoding in ("br", "gzip") if brotli is not None else ("gzip",):
+        if offered.get(encoding, offered.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+# The GUI page never changes, so every encoding is compressed once at import.
+_GUI_ENCODED = {"gzip": HTML_GZIP}
+if brotli is not None:
+    _GUI_ENCODED["br"] = brotli.compress(HTML_BYTES, quality=11)
+
+
+def _encoded(
+    response: Response, accept_encoding: str, key: Optional[str] = None
+) -> Response:
+    """Compress *response* in-process when the client accepts it.
+
+    With the response cache *key* its body was built from, the compressed
+    bytes are kept next to that cache entry and reused by later requests.
+    """
+    encoding = _pick_encoding(accept_encoding)
+    if encoding is None or len(response.body) < _MIN_COMPRESS_SIZE:
+        return response
+    return Response(
+        content=_compress_cached(key, response.body, encoding),
+        media_type=response.media_type,
+        headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+    )
+
+
+# Remote dumps are keyed on the URL and every option (including the token,
+# so private results are never served to another caller). Entries expire so
+# moving refs such as HEAD are eventually fetched again. The least recently
+# used entries are evicted once dumps and compressed bodies together exceed
+# _RESPONSE_CACHE_MAX_BYTES (counting a character of a dump as one byte).
+_RESPONSE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+_RESPONSE_CACHE_TTL = 300.0
+# Each entry holds (stored at, dump, dump size, compressed bodies by encoding).
+_CacheEntry = Tuple[float, Any, int, Dict[str, bytes]]
+_RESPONSE_CACHE: OrderedDict[str, _CacheEntry] = OrderedDict()
+_RESPONSE_CACHE_LOCK = threading.Lock()
+
+
+def _response_key(remote_url: str, split: Optional[int], opts: dict) -> str:
+    payload = json.dumps([remote_url, split, opts], sort_keys=True)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _response_cache_get(key: Optional[str]) -> Any:
+    if key is None:
+        return None
+    with _RESPONSE_CACHE_LOCK:
+        hit = _RESPONSE_CACHE.get(key)
+        if hit is None or time.monotonic() - hit[0] >= _RESPONSE_CACHE_TTL:
+            return None
+        _RESPONSE_CACHE.move_to_end(key)
+        return hit[1]
+
+
+def _dump_size(value: Any) -> int:
+    if isinstance(value, str):
+        return len(value)
+    # Split dumps are lists of (filename, content) parts.
+    return sum(len(name or "") + len(content) for name, content in value)
+
+
+def _evict_response_cache() -> None:
+    """Drop least recently used entries until the cache fits its budget.
+
+    The caller holds ``_RESPONSE_CACHE_LOCK``.
+    """
+    total = sum(
+        size + sum(map(len, packed.values()))
+        for _, _, size, packed in _RESPONSE_CACHE.values()
+    )
+    while total > _RESPONSE_CACHE_MAX_BYTES and _RESPONSE_CACHE:
+        _, (_, _, size, packed) = _RESPONSE_CACHE.popitem(last=False)
+        total -= size + sum(map(len, packed.values()))
+
+
+def _response_cache_put(key: Optional[str], value: Any) -> None:
+    if key is None:
+        return
+    size = _dump_size(value)
+    if size > _RESPONSE_CACHE_MAX_BYTES:
+        return
+    with _RESPONSE_CACHE_LOCK:
+        _RESPONSE_CACHE[key] = (time.monotonic(), value, size, {})
+        _RESPONSE_CACHE.move_to_end(key)
+        _evict_response_cache()
+
+
+def _compress_cached(key: Optional[str], data: bytes, encoding: str) -> bytes:
+    """Return *data* compressed with *encoding*, reusing a copy cached at *key*.
+
+    The copy lives in the cache entry itself, so it expires, or is replaced,
+    together with the dump it was made from.
+    """
+    with _RESPONSE_CACHE_LOCK:
+        hit = _RESPONSE_CACHE.get(key) if key is not None else None
+        if hit is not None and encoding in hit[3]:
+            return hit[3][encoding]
+    packed = compress(data, encoding)
+    if hit is not None:
+        with _RESPONSE_CACHE_LOCK:
+            if _RESPONSE_CACHE.get(key) is hit:
+                hit[3][encoding] = packed
+                _evict_response_cache()
+    return packed
+
+
+def _stream_and_cache(key: Optional[str], pieces: Iterator[str]) -> Iterator[bytes]:
+    """Encode *pieces* for streaming and cache the full dump once sent."""
+    seen: List[str] = []
+    for piece in pieces:
+        seen.append(piece)
+        yield piece.encode("utf-8")
+    _response_cache_put(key, "".join(seen))
+
+
+def _json_response(payload: dict) -> Response:
+    """Serialise *payload* with orjson when installed, else like JSONResponse."""
+    if orjson is None:
+        return JSONResponse(content=payload)
+    return Response(content=orjson.dumps(payload), media_type="application/json")
+
+
 class DumpRequest(BaseModel):
+    # Requests are only read, never modified, once validated.
+    model_config = ConfigDict(frozen=True)
+
     remote_url: str = Field(..., description="Git repo URL to download")
     private_token: Optional[str] = Field(None, description="Token for private repos")
     include: List[str] = Field(["*"], description="Glob(s) to include")
@@ -38,6 +210,32 @@ class DumpRequest(BaseModel):
     exclude_comments: bool = Field(False, description="Strip code comments from output")
     not_ignore: bool = Field(False, description="Do not respect .gitignore rules")
 
+# Option defaults for a GitHub-path POST without a body; built once.
+_DEFAULT_DUMP_REQUEST = DumpRequest(remote_url="")
+
+
+async def _handle_dump_request(
+    remote_url: str,
+    request: DumpRequest,
+    auth: Optional[HTTPAuthorizationCredentials],
+    accept_encoding: str,
+):
+    return await _handle_dump(
+        remote_url=remote_url,
+        private_token=request.private_token,
+        include=request.include,
+        exclude=request.exclude,
+        max_size=request.max_size,
+        max_tokens=request.max_tokens,
+        split=request.split,
+        fmt=request.format,
+        binary_strict=request.binary_strict,
+        exclude_comments=request.exclude_comments,
+        not_ignore=request.not_ignore,
+        auth=auth,
+        accept_encoding=accept_encoding,
+    )
+
 async def _handle_dump(
     remote_url: str,
     private_token: Optional[str] = None,
@@ -51,72 +249,80 @@ async def _handle_dump(
     exclude_comments: bool = False,
     not_ignore: bool = False,
     auth: Optional[HTTPAuthorizationCredentials] = None,
+    accept_encoding: str = "",
 ):
     # Use Bearer token if provided, otherwise fallback to private_token
     token = (auth.credentials if auth else None) or private_token
-    
+    opts = {
+        "fmt": fmt,
+        "include": include,
+        "exclude": exclude,
+        "max_size": max_size,
+        "max_tokens": max_tokens,
+        "binary_strict": binary_strict,
+        "exclude_comments": exclude_comments,
+        "respect_gitignore": not not_ignore,
+        "private_token": token,
+    }
+    # Local directories can change between requests; the renderer already
+    # caches those by file manifest.
+    key = None
+    if _looks_remote(remote_url):
+        key = _response_key(remote_url, split, opts)
+    cached = _response_cache_get(key)
+
+    # Collection, rendering and compression are blocking and CPU-heavy, so
+    # they run in worker threads to keep the event loop free for other
+    # requests.
     try:
         if split:
-            parts = dump_repo_split(
-                remote_url,
-                split,
-                fmt=fmt,
-                include=include,
-                exclude=exclude,
-                max_size=max_size,
-                max_tokens=max_tokens,
-                binary_strict=binary_strict,
-                exclude_comments=exclude_comments,
-                respect_gitignore=not not_ignore,
-                private_token=token,
-            )
-            return JSONResponse(content={
+            parts = cached
+            if parts is None:
+                parts = await asyncio.to_thread(
+                    dump_repo_split, remote_url, split, **opts
+                )
+                _response_cache_put(key, parts)
+            return await asyncio.to_thread(_encoded, _json_response({
                 "status": "success",
                 "parts": [{"filename": f, "content": c} for f, c in parts]
-            })
-
-        content = dump_repo(
-            remote_url,
-            fmt=fmt,
-            include=include,
-            exclude=exclude,
-            max_size=max_size,
-            max_tokens=max_tokens,
-            binary_strict=binary_strict,
-            exclude_comments=exclude_comments,
-            respect_gitignore=not not_ignore,
-            private_token=token,
-        )
-        
-        if fmt == "json":
-            return JSONResponse(content={"status": "success", "content": content})
-            
+            }), accept_encoding, key)
+
         media_type = "text/plain"
         if fmt == "html":
             media_type = "text/html"
-            
-        return Response(content=content, media_type=media_type)
+
+        if cached is None and fmt != "json" and _pick_encoding(accept_encoding) is None:
+            # Nothing to compress, so send pieces as they are rendered instead
+            # of joining the whole dump first. Pull the first piece here so
+            # collection errors still become a 500 rather than a cut stream.
+            pieces = dump_repo_iter(remote_url, **opts)
+            first = await asyncio.to_thread(next, pieces, "")
+            return StreamingResponse(
+                _stream_and_cache(key, itertools.chain([first], pieces)),
+                media_type=media_type,
+            )
+
+        content = cached
+        if content is None:
+            content = await asyncio.to_thread(dump_repo, remote_url, **opts)
+            _response_cache_put(key, content)
+
+        if fmt == "json":
+            response = _json_response({"status": "success", "content": content})
+        else:
+            response = Response(content=content, media_type=media_type)
+        return await asyncio.to_thread(_encoded, response, accept_encoding, key)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/dump", summary="Generate a repository dump (POST)")
 async def generate_dump_post(
     request: DumpRequest,
-    auth: Optional[HTTPAuthorizationCredentials] = Depends(security)
+    auth: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    accept_encoding: str = Header("", include_in_schema=False),
 ):
-    return await _handle_dump(
-        remote_url=request.remote_url,
-        private_token=request.private_token,
-        include=request.include,
-        exclude=request.exclude,
-        max_size=request.max_size,
-        max_tokens=request.max_tokens,
-        split=request.split,
-        fmt=request.format,
-        binary_strict=request.binary_strict,
-        exclude_comments=request.exclude_comments,
-        not_ignore=request.not_ignore,
-        auth=auth,
+    return await _handle_dump_request(
+        request.remote_url, request, auth, accept_encoding
     )
 
 @app.get("/dump", summary="Generate a repository dump (GET)")
@@ -132,7 +338,8 @@ async def generate_dump_get(
     binary_strict: bool = Query(True, description="Use strict binary detection"),
     exclude_comments: bool = Query(False, description="Strip code comments from output"),
     not_ignore: bool = Query(False, description="Do not respect .gitignore rules"),
-    auth: Optional[HTTPAuthorizationCredentials] = Depends(security)
+    auth: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    accept_encoding: str = Header("", include_in_schema=False),
 ):
     return await _handle_dump(
         remote_url=remote_url,
@@ -147,6 +354,7 @@ async def generate_dump_get(
         exclude_comments=exclude_comments,
         not_ignore=not_ignore,
         auth=auth,
+        accept_encoding=accept_encoding,
     )
 
 @app.get("/dump/{user}/{repo:path}", summary="Generate a repository dump for a GitHub user/repo/subtree (GET)")
@@ -163,7 +371,8 @@ async def generate_dump_github_get(
     binary_strict: bool = Query(True, description="Use strict binary detection"),
     exclude_comments: bool = Query(False, description="Strip code comments from output"),
     not_ignore: bool = Query(False, description="Do not respect .gitignore rules"),
-    auth: Optional[HTTPAuthorizationCredentials] = Depends(security)
+    auth: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    accept_encoding: str = Header("", include_in_schema=False),
 ):
     # repo can be "reponame" or "reponame/tree/branch/path"
     remote_url = f"https://github.com/{user}/{repo}"
@@ -180,6 +389,7 @@ async def generate_dump_github_get(
         exclude_comments=exclude_comments,
         not_ignore=not_ignore,
         auth=auth,
+        accept_encoding=accept_encoding,
     )
 
 @app.post("/dump/{user}/{repo:path}", summary="Generate a repository dump for a GitHub user/repo/subtree (POST)")
@@ -187,40 +397,113 @@ async def generate_dump_github_post(
     user: str,
     repo: str,
     request: Optional[DumpRequest] = None,
-    auth: Optional[HTTPAuthorizationCredentials] = Depends(security)
+    auth: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    accept_encoding: str = Header("", include_in_schema=False),
 ):
     # repo can be "reponame" or "reponame/tree/branch/path"
     remote_url = f"https://github.com/{user}/{repo}"
-    if request:
-        return await _handle_dump(
-            remote_url=remote_url,
-            private_token=request.private_token,
-            include=request.include,
-            exclude=request.exclude,
-            max_size=request.max_size,
-            max_tokens=request.max_tokens,
-            split=request.split,
-            fmt=request.format,
-            binary_strict=request.binary_strict,
-            exclude_comments=request.exclude_comments,
-            not_ignore=request.not_ignore,
-            auth=auth,
-        )
-    return await _handle_dump(
-        remote_url=remote_url,
-        auth=auth,
+    return await _handle_dump_request(
+        remote_url, request or _DEFAULT_DUMP_REQUEST, auth, accept_encoding
     )
 
+# Characters YAML does not allow raw in a stream (DEL, C1 controls, lone
+# surrogates, non-characters) or would fold as line breaks (NEL, U+2028/9),
+# plus the BOM; all are written as escapes inside double quotes.
+_YAML_UNSAFE = re.compile("[\x7f-\x9f\u2028\u2029\ufeff\ufffe\uffff\ud800-\udfff]")
+# YAML 1.1 (PyYAML) reads "1e-05" as a string: floats need a dot in the
+# mantissa and a signed exponent, which repr() always writes.
+_BARE_EXPONENT = re.compile(r"^(-?\d+)(e)")
+
+
+def _yaml_scalar(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float):
+        if math.isnan(value):
+            return ".nan"
+        if math.isinf(value):
+            return ".inf" if value > 0 else "-.inf"
+        return _BARE_EXPONENT.sub(r"\1.0\2", repr(value))
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, dict):
+        return "{}"
+    if isinstance(value, list):
+        return "[]"
+    # JSON string escapes are valid in YAML double-quoted scalars.
+    quoted = json.dumps(str(value), ensure_ascii=False)
+    return _YAML_UNSAFE.sub(lambda m: f"\\u{ord(m.group()):04x}", quoted)
+
+
+def _yaml_lines(obj: Any, depth: int) -> Iterator[str]:
+    pad = "  " * depth
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            if isinstance(value, (dict, list)) and value:
+                yield f"{pad}{_yaml_scalar(str(key))}:"
+                yield from _yaml_lines(value, depth + 1)
+            else:
+                yield f"{pad}{_yaml_scalar(str(key))}: {_yaml_scalar(value)}"
+    else:
+        for item in obj:
+            if isinstance(item, (dict, list)) and item:
+                nested = _yaml_lines(item, depth + 1)
+                # The first nested line shares the "- " with its list marker.
+                yield f"{pad}- {next(nested).lstrip()}"
+                yield from nested
+            else:
+                yield f"{pad}- {_yaml_scalar(item)}"
+
+
+def _fast_yaml(obj: Any) -> str:
+    """Emit JSON-compatible *obj* as block-style YAML.
+
+    Only what an OpenAPI document contains is supported: dicts, lists,
+    strings, numbers, booleans and None. Strings are always double-quoted.
+    """
+    if isinstance(obj, (dict, list)) and obj:
+        return "\n".join(_yaml_lines(obj, 0)) + "\n"
+    return _yaml_scalar(obj) + "\n"
+
+
+def _dump_yaml(obj: Any) -> str:
+    # The optional ryaml backend is imported here, not at module import, as
+    # the YAML document is built at most once per process.
+    try:
+        import ryaml
+    except ImportError:
+        return _fast_yaml(obj)
+    return ryaml.dumps(obj)
+
+
+# The schema cannot change once the routes are registered, so its YAML form
+# is rendered on first use and then served from memory.
+_openapi_yaml_cache: Optional[bytes] = None
+
+
+def _openapi_yaml() -> bytes:
+    global _openapi_yaml_cache
+    if _openapi_yaml_cache is None:
+        # app.openapi() stores its result on app.openapi_schema.
+        _openapi_yaml_cache = _dump_yaml(app.openapi()).encode("utf-8")
+    return _openapi_yaml_cache
+
+
+def reset_openapi_cache() -> None:
+    """Forget the cached schema, e.g. after adding routes in tests."""
+    global _openapi_yaml_cache
+    _openapi_yaml_cache = None
+    app.openapi_schema = None
+
+
 @app.get("/openapi.yaml", include_in_schema=False)
 async def get_openapi_yaml():
-    openapi_schema = app.openapi()
-    yaml_schema = yaml.dump(openapi_schema, sort_keys=False)
-    return Response(content=yaml_schema, media_type="text/yaml")
+    return Response(content=_openapi_yaml(), media_type="text/yaml")
 
 def save_openapi_spec(output_path: Path):
-    openapi_schema = app.openapi()
-    with open(output_path, "w") as f:
-        yaml.dump(openapi_schema, f, sort_keys=False)
+    Path(output_path).write_bytes(_openapi_yaml())
 
 def run_server():
     import uvicorn
@@ -2,21 +2,74 @@
 
 from __future__ import annotations
 
+import os
+import threading
+import time
 from pathlib import Path
-from typing import Iterable
+from typing import Any, Iterable, List
 
 from .loader import load_text
 
+# After tiktoken fails to load (not installed, or its BPE file cannot be
+# fetched offline), the fallback estimate is used for this many seconds
+# before loading is tried again.
+_ENCODING_RETRY = 60.0
+_ENCODING: Any = None
+_ENCODING_FAILED_AT: float | None = None
+_ENCODING_LOCK = threading.Lock()
+
+
+def _encoding() -> Any:
+    """Return the cl100k_base encoding, or None while it is unavailable."""
+    global _ENCODING, _ENCODING_FAILED_AT
+    if _ENCODING is not None:
+        return _ENCODING
+    with _ENCODING_LOCK:
+        failed_at = _ENCODING_FAILED_AT
+        if _ENCODING is None and (
+            failed_at is None or time.monotonic() - failed_at >= _ENCODING_RETRY
+        ):
+            try:
+                import tiktoken
+
+                _ENCODING = tiktoken.get_encoding("cl100k_base")
+            except Exception:
+                _ENCODING_FAILED_AT = time.monotonic()
+        return _ENCODING
+
+
+def _estimate(text: str) -> int:
+    return max(1, len(text) // 4)
+
 
 def approximate_tokens(text: str) -> int:
     """Return approximate token count of ``text``."""
+    enc = _encoding()
+    if enc is None:
+        return _estimate(text)
     try:
-        import tiktoken
-
-        enc = tiktoken.get_encoding("cl100k_base")
-        return len(enc.encode(text))
+        return len(enc.encode_ordinary(text))
     except Exception:
-        return max(1, len(text) // 4)
+        return _estimate(text)
+
+
+def approximate_tokens_batch(texts: List[str]) -> List[int]:
+    """Return :func:`approximate_tokens` for each of *texts*, in order.
+
+    tiktoken encodes the batch on several threads with the GIL released,
+    so on multi-core machines this is faster than counting one by one.
+    """
+    enc = _encoding()
+    if enc is None:
+        return [_estimate(text) for text in texts]
+    threads = min(len(texts), os.cpu_count() or 1)
+    if threads > 1:
+        try:
+            encoded = enc.encode_ordinary_batch(texts, num_threads=threads)
+            return [len(tokens) for tokens in encoded]
+        except Exception:
+            pass
+    return [approximate_tokens(text) for text in texts]
 
 
 def total_tokens(paths: Iterable[Path]) -> int:
@@ -3,10 +3,18 @@
 from __future__ import annotations
 
 import mimetypes
+import os
 import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 ASCII_WHITELIST = set(b"\t\n\r")
+# Printable ASCII plus the whitelist; deleting these leaves the non-text bytes.
+_TEXT_BYTES = bytes(range(32, 127)) + bytes(sorted(ASCII_WHITELIST))
 
 # Common source code file extensions that should be treated as text
 CODE_EXTENSIONS = {
@@ -90,39 +98,220 @@ CODE_EXTENSIONS = {
     ".fsscript",
 }
 
+# Extensions that are binary without looking at the content. Classifying
+# these never opens the file; several are unknown to (or mislabelled by)
+# ``mimetypes``, which would otherwise force a read.
+BINARY_EXTENSIONS = frozenset(
+    {
+        # Images
+        ".png",
+        ".jpg",
+        ".jpeg",
+        ".gif",
+        ".bmp",
+        ".ico",
+        ".webp",
+        ".psd",
+        # Archives and packages
+        ".zip",
+        ".gz",
+        ".tgz",
+        ".bz2",
+        ".xz",
+        ".zst",
+        ".7z",
+        ".rar",
+        ".jar",
+        ".whl",
+        ".egg",
+        ".iso",
+        # Compiled objects and executables
+        ".a",
+        ".o",
+        ".so",
+        ".dylib",
+        ".dll",
+        ".lib",
+        ".exe",
+        ".bin",
+        ".class",
+        ".pyc",
+        ".pyo",
+        ".wasm",
+        # Fonts
+        ".ttf",
+        ".otf",
+        ".woff",
+        ".woff2",
+        ".eot",
+        # Media and documents
+        ".mp3",
+        ".mp4",
+        ".pdf",
+        # Data
+        ".db",
+        ".sqlite",
+        ".npy",
+        ".npz",
+        ".pkl",
+        ".parquet",
+    }
+)
+
+# Bytes sniffed from the start of a file to classify it.
+SNIFF_SIZE = 8192
+# Skip atime updates where supported (Linux); only allowed for the file owner.
+_O_NOATIME = getattr(os, "O_NOATIME", 0)
+
+# Sniff verdicts keyed on file identity and change stamps, so repeat scans
+# in one process (server, watch loops) skip re-reading unchanged files.
+_BINARY_CACHE_SIZE = 8192
+# Files changed this recently are not cached: a same-size rewrite within the
+# filesystem's timestamp granularity would otherwise keep a stale verdict.
+_BINARY_CACHE_RACY_NS = 2_000_000_000
+_BinaryKey = Tuple[int, int, int, int, int, bool]
+_BINARY_CACHE: OrderedDict[_BinaryKey, bool] = OrderedDict()
+_BINARY_CACHE_LOCK = threading.Lock()
+
+
+def _read_head(path: str | Path, size: int = SNIFF_SIZE) -> bytes:
+    """Return up to *size* leading bytes of *path* with raw ``os`` calls.
+
+    Raises:
+        OSError: If the file cannot be opened or read.
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY | _O_NOATIME)
+    except PermissionError:
+        if not _O_NOATIME:
+            raise
+        fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.read(fd, size)
+    finally:
+        os.close(fd)
+
+
+@lru_cache(maxsize=512)
+def _mime_for_suffix(suffix: str) -> str | None:
+    """Return the guessed MIME type for files ending in *suffix*."""
+    return mimetypes.guess_type("x" + suffix)[0]
+
 
-def is_binary_path(path: Path, *, strict: bool = True) -> bool:
+def is_binary_path(
+    path: str | Path, *, strict: bool = True, stat: os.stat_result | None = None
+) -> bool:
     """Return True if file looks binary."""
-    # Check file extension first - many code files have incorrect MIME types
-    ext = path.suffix.lower()
-    if ext in CODE_EXTENSIONS:
-        # For known code files, only check for null bytes
+    stats = None if stat is None else [stat]
+    return classify_paths([path], strict=strict, stats=stats)[0]
+
+
+def _binary_key(stat: os.stat_result, check: bool) -> _BinaryKey | None:
+    """Return the sniff cache key for *stat*, or None if it must not be cached."""
+    # DirEntry.stat() on Windows leaves st_ino zero, so it cannot tell files apart.
+    if not stat.st_ino:
+        return None
+    if time.time_ns() - stat.st_mtime_ns < _BINARY_CACHE_RACY_NS:
+        return None
+    return (
+        stat.st_dev,
+        stat.st_ino,
+        stat.st_size,
+        stat.st_mtime_ns,
+        stat.st_ctime_ns,
+        check,
+    )
+
+
+def classify_paths(
+    paths: Iterable[str | Path],
+    *,
+    strict: bool = True,
+    stats: Iterable[os.stat_result] | None = None,
+) -> List[bool]:
+    """Return :func:`is_binary_path` for each of *paths*, in order.
+
+    All heads are read first and classified afterwards, so the reads run
+    back to back and the checks loop over plain lists. Verdicts for files
+    that must be sniffed are cached on device, inode, size and timestamps;
+    pass *stats* (one per path) when the caller has already stat'ed them.
+    """
+    path_list = list(paths)
+    stat_list: List[Optional[os.stat_result]] = (
+        list(stats) if stats is not None else [None] * len(path_list)
+    )
+    # Phase 1: a verdict per path where one is known without reading, and a
+    # sniffed head for the rest, plus whether the strict non-text ratio
+    # applies to it and the key its verdict is cached under.
+    results: List[bool] = []
+    sniffed: List[Tuple[int, bytes | None, bool, _BinaryKey | None]] = []
+    for path, stat in zip(path_list, stat_list):
+        # Same as Path.suffix, without building a Path for str input.
+        ext = os.path.splitext(path)[1].lower()
+        if ext in BINARY_EXTENSIONS:
+            results.append(True)
+            continue
+        # Check file extension first - many code files have incorrect MIME
+        # types. For known code files, only check for null bytes.
+        is_code = ext in CODE_EXTENSIONS
+        check = strict and not is_code
+        if not is_code:
+            # Fall back to MIME type detection for other files
+            mime = _mime_for_suffix(ext)
+            if mime is not None and not mime.startswith("text"):
+                results.append(True)
+                continue
         try:
-            with open(path, "rb") as fh:
-                chunk = fh.read(8192)
-            return b"\0" in chunk
+            key = _binary_key(stat if stat is not None else os.stat(path), check)
         except OSError:
-            return True
+            results.append(True)
+            continue
+        if key is not None:
+            with _BINARY_CACHE_LOCK:
+                cached = _BINARY_CACHE.get(key)
+                if cached is not None:
+                    _BINARY_CACHE.move_to_end(key)
+            if cached is not None:
+                results.append(cached)
+                continue
+        try:
+            head: bytes | None = _read_head(path)
+        except OSError:
+            head = None
+        sniffed.append((len(results), head, check, key))
+        results.append(True)  # placeholder, set in phase 2
+
+    # Phase 2: classify the collected heads.
+    fresh: List[Tuple[_BinaryKey, bool]] = []
+    for index, head, check, key in sniffed:
+        binary = (
+            head is None
+            or b"\0" in head
+            or (
+                check
+                and bool(head)
+                and len(head.translate(None, _TEXT_BYTES)) / len(head) > 0.30
+            )
+        )
+        results[index] = binary
+        if key is not None and head is not None:
+            fresh.append((key, binary))
+    if fresh:
+        with _BINARY_CACHE_LOCK:
+            _BINARY_CACHE.update(fresh)
+            while len(_BINARY_CACHE) > _BINARY_CACHE_SIZE:
+                _BINARY_CACHE.popitem(last=False)
+    return results
 
-    # Fall back to MIME type detection for other files
-    mime, _ = mimetypes.guess_type(path.as_posix())
-    if mime is not None and not mime.startswith("text"):
-        return True
 
-    try:
-        with open(path, "rb") as fh:
-            chunk = fh.read(8192)
-        if b"\0" in chunk:
-            return True
-        if strict and chunk:
-            non_text = sum(
-                1 for b in chunk if not (32 <= b <= 126 or b in ASCII_WHITELIST)
-            )
-            if non_text / len(chunk) > 0.30:
-                return True
-        return False
-    except OSError:
-        return True
+# Identical small files (licenses, vendored copies, templates) are stripped
+# once. Larger contents bypass the cache so it cannot pin much memory.
+_STRIP_CACHE_MAX_CHARS = 64 * 1024
+
+
+@lru_cache(maxsize=256)
+def _strip_cached(content: str, ext: str) -> str:
+    return _STRIPPERS[ext](content)
 
 
 def strip_comments(content: str, file_path: Path) -> str:
@@ -136,383 +325,212 @@ def strip_comments(content: str, file_path: Path) -> str:
         Content with comments removed.
     """
     ext = file_path.suffix.lower()
+    stripper = _STRIPPERS.get(ext)
+    # Return original content for unsupported file types
+    if stripper is None:
+        return content
+    if len(content) <= _STRIP_CACHE_MAX_CHARS:
+        return _strip_cached(content, ext)
+    return stripper(content)
 
-    # Languages with # comments (Python, Ruby, Shell, YAML, etc.)
-    if ext in {
-        ".py",
-        ".pyw",
-        ".rb",
-        ".sh",
-        ".bash",
-        ".zsh",
-        ".yml",
-        ".yaml",
-        ".toml",
-        ".conf",
-        ".ini",
-        ".r",
-        ".pl",
-        ".tcl",
-    }:
-        return _strip_hash_comments(content)
-
-    # Languages with // and /* */ comments
-    # (C-style: C, C++, Java, JavaScript, Go, Rust, etc.)
-    elif ext in {
-        ".c",
-        ".h",
-        ".cpp",
-        ".hpp",
-        ".cc",
-        ".cxx",
-        ".java",
-        ".js",
-        ".jsx",
-        ".ts",
-        ".tsx",
-        ".go",
-        ".rs",
-        ".cs",
-        ".swift",
-        ".kt",
-        ".kts",
-        ".scala",
-        ".m",
-        ".mm",
-        ".php",
-        ".dart",
-    }:
-        return _strip_c_style_comments(content)
-
-    # HTML/XML
-    elif ext in {".html", ".htm", ".xml", ".svg", ".xhtml"}:
-        return _strip_html_comments(content)
-
-    # CSS
-    elif ext in {".css", ".scss", ".sass", ".less"}:
-        return _strip_css_comments(content)
-
-    # SQL
-    elif ext in {".sql"}:
-        return _strip_sql_comments(content)
 
-    # Lua
-    elif ext in {".lua"}:
-        return _strip_lua_comments(content)
+# Code before a line comment: runs of ordinary characters and quoted strings
+# (unterminated ones run to end of line). ``match`` stops at the first marker
+# found outside a string, so ``m.end()`` is where the comment starts.
+_HASH_CODE_RE = re.compile(
+    r"""(?:[^'"#]+|"[^"\\]*(?:\\.?[^"\\]*)*"?|'[^'\\]*(?:\\.?[^'\\]*)*'?)*"""
+)
+_LISP_CODE_RE = re.compile(r"""(?:[^";]+|"[^"\\]*(?:\\.?[^"\\]*)*"?)*""")
 
-    # Haskell
-    elif ext in {".hs", ".lhs"}:
-        return _strip_haskell_comments(content)
 
-    # Lisp-family
-    elif ext in {".lisp", ".cl", ".el", ".scm", ".clj", ".cljs"}:
-        return _strip_lisp_comments(content)
-
-    # Return original content for unsupported file types
-    return content
+def _strip_line_comments_re(content: str, code: re.Pattern[str]) -> str:
+    """Cut every line of *content* after its *code* prefix and rstrip it."""
+    match = code.match
+    return "\n".join(
+        # The pattern can match empty, so match() never returns None here.
+        line[: match(line).end()].rstrip()  # type: ignore[union-attr]
+        for line in content.splitlines()
+    )
 
 
 def _strip_hash_comments(content: str) -> str:
     """Strip # comments from content, preserving strings."""
-    lines = []
-    for line in content.splitlines():
-        # Find # not in strings
-        in_single = False
-        in_double = False
-        escape = False
-        result = []
-        i = 0
-        while i < len(line):
-            char = line[i]
-
-            # If previous character started an escape sequence,
-            # treat this character as escaped and do not change string state.
-            if escape:
-                result.append(char)
-                escape = False
-                i += 1
-                continue
+    return _strip_line_comments_re(content, _HASH_CODE_RE)
 
-            # Start a new escape sequence when we see an unescaped backslash
-            # inside a string. The next character will be treated as escaped.
-            if char == "\\" and (in_single or in_double):
-                result.append(char)
-                escape = True
-                i += 1
-                continue
 
-            # Toggle string states
-            if char == "'" and not in_double:
-                in_single = not in_single
-                result.append(char)
-            elif char == '"' and not in_single:
-                in_double = not in_double
-                result.append(char)
-            elif char == "#" and not in_single and not in_double:
-                # Found a comment, stop processing this line
-                break
-            else:
-                result.append(char)
-            i += 1
-
-        lines.append("".join(result).rstrip())
-    return "\n".join(lines)
+# One scan over C-style source: string literals (group 1) are kept verbatim,
+# comments are dropped. Unterminated strings and block comments run to EOF,
+# and a // comment stops before its newline so line structure survives.
+_C_STYLE_RE = re.compile(
+    r"""("[^"\\]*(?:\\.?[^"\\]*)*"?|'[^'\\]*(?:\\.?[^'\\]*)*'?)"""
+    r"|//[^\n]*"
+    r"|/\*[^*]*(?:\*+[^*/][^*]*)*(?:\*+/?)?",
+    re.DOTALL,
+)
+
+
+def _keep_strings(match: re.Match[str]) -> str:
+    return match.group(1) or ""
 
 
 def _strip_c_style_comments(content: str) -> str:
     """Strip // and /* */ comments, preserving strings."""
-    result = []
-    i = 0
-    in_single = False
-    in_double = False
-    escape = False
-
-    while i < len(content):
-        char = content[i]
-
-        # If previous character started an escape sequence,
-        # treat this character as escaped and do not change string state.
-        if escape:
-            result.append(char)
-            escape = False
-            i += 1
-            continue
+    return _C_STYLE_RE.sub(_keep_strings, content)
 
-        # Start a new escape sequence when we see an unescaped backslash
-        # inside a string. The next character will be treated as escaped.
-        if char == "\\" and (in_single or in_double):
-            result.append(char)
-            escape = True
-            i += 1
-            continue
 
-        # Toggle string states
-        if char == "'" and not in_double:
-            in_single = not in_single
-            result.append(char)
-            i += 1
-        elif char == '"' and not in_single:
-            in_double = not in_double
-            result.append(char)
-            i += 1
-        elif not in_single and not in_double:
-            # Check for // comment
-            if char == "/" and i + 1 < len(content) and content[i + 1] == "/":
-                # Skip until end of line
-                while i < len(content) and content[i] != "\n":
-                    i += 1
-                if i < len(content):
-                    result.append("\n")
-                    i += 1
-            # Check for /* */ comment
-            elif char == "/" and i + 1 < len(content) and content[i + 1] == "*":
-                i += 2
-                # Skip until */
-                while i < len(content):
-                    if (
-                        i + 1 < len(content)
-                        and content[i] == "*"
-                        and content[i + 1] == "/"
-                    ):
-                        i += 2
-                        break
-                    i += 1
-            else:
-                result.append(char)
-                i += 1
-        else:
-            result.append(char)
-            i += 1
-
-    return "".join(result)
+# ``<!--.*?-->`` unrolled: runs of non-dashes, and dashes not starting
+# ``->``, so the body is consumed without lazy one-character steps.
+_HTML_COMMENT_RE = re.compile(r"<!--[^-]*(?:-(?!->)[^-]*)*-->")
 
 
 def _strip_html_comments(content: str) -> str:
     """Strip HTML/XML <!-- --> comments."""
-    return re.sub(r"<!--.*?-->", "", content, flags=re.DOTALL)
+    return _HTML_COMMENT_RE.sub("", content)
+
+
+# Like _C_STYLE_RE without ``//``: CSS only has block comments.
+_CSS_RE = re.compile(
+    r"""("[^"\\]*(?:\\.?[^"\\]*)*"?|'[^'\\]*(?:\\.?[^'\\]*)*'?)"""
+    r"|/\*[^*]*(?:\*+[^*/][^*]*)*(?:\*+/?)?",
+    re.DOTALL,
+)
 
 
 def _strip_css_comments(content: str) -> str:
     """Strip CSS /* */ comments, preserving strings."""
-    result: list[str] = []
-    i = 0
-    length = len(content)
-    in_single = False
-    in_double = False
-    in_comment = False
-
-    while i < length:
-        ch = content[i]
-        next_ch = content[i + 1] if i + 1 < length else ""
-
-        if in_comment:
-            # Look for end of comment
-            if ch == "*" and next_ch == "/":
-                in_comment = False
-                i += 2
-            else:
-                i += 1
-            continue
+    return _CSS_RE.sub(_keep_strings, content)
 
-        # Handle start of comment (only when not inside a string)
-        if not in_single and not in_double and ch == "/" and next_ch == "*":
-            in_comment = True
-            i += 2
-            continue
 
-        # Handle escape sequences inside strings: keep backslash + next char
-        if (in_single or in_double) and ch == "\\" and i + 1 < length:
-            result.append(ch)
-            result.append(content[i + 1])
-            i += 2
-            continue
+# Code before a ``--`` comment. A backslash escapes the next character both
+# inside and outside quotes, and a lone ``-`` is ordinary code.
+_DASH_CODE_RE = re.compile(
+    r"""(?:[^'"\\-]+|\\.?|-(?!-)"""
+    r"""|"[^"\\]*(?:\\.?[^"\\]*)*"?|'[^'\\]*(?:\\.?[^'\\]*)*'?)*"""
+)
 
-        # Toggle string states
-        if ch == "'" and not in_double:
-            in_single = not in_single
-            result.append(ch)
-            i += 1
-            continue
-        if ch == '"' and not in_single:
-            in_double = not in_double
-            result.append(ch)
-            i += 1
-            continue
 
-        # Regular character
-        result.append(ch)
-        i += 1
-
-    return "".join(result)
-
-
-def _strip_line_comment(line: str, marker: str) -> str:
-    """Strip a line comment starting with marker, ignoring markers inside strings."""
-    in_single = False
-    in_double = False
-    escape = False
-    i = 0
-    length = len(line)
-    while i < length:
-        ch = line[i]
-        if escape:
-            # Current character is escaped; skip special handling.
-            escape = False
-        elif ch == "\\":
-            # Start of an escape sequence.
-            escape = True
-        elif ch == "'" and not in_double:
-            # Toggle single-quoted (character) literal.
-            in_single = not in_single
-        elif ch == '"' and not in_single:
-            # Toggle double-quoted string literal.
-            in_double = not in_double
-        elif not in_single and not in_double and line.startswith(marker, i):
-            # Marker found outside of any string/char literal: start of comment.
-            return line[:i].rstrip()
-        i += 1
-    return line
-
-
-def _strip_sql_line_comment(line: str) -> str:
-    """Strip a SQL -- line comment from a single line, preserving string literals."""
-    in_single = False
-    in_double = False
-    i = 0
-    length = len(line)
-    while i < length:
-        ch = line[i]
-        # Handle single-quoted strings and doubled-quote escapes (e.g. 'it''s')
-        if ch == "'" and not in_double:
-            if in_single and i + 1 < length and line[i + 1] == "'":
-                # Escaped single quote inside a single-quoted string
-                i += 2
-                continue
-            in_single = not in_single
-            i += 1
-            continue
-        # Handle double-quoted identifiers/strings
-        # and doubled-quote escapes (e.g. "a""b")
-        if ch == '"' and not in_single:
-            if in_double and i + 1 < length and line[i + 1] == '"':
-                # Escaped double quote inside a double-quoted string
-                i += 2
-                continue
-            in_double = not in_double
-            i += 1
-            continue
-        # Detect start of a line comment when not inside any string literal
-        if not in_single and not in_double and ch == "-" and i + 1 < length:
-            if line[i + 1] == "-":
-                return line[:i].rstrip()
-        i += 1
-    return line
+def _cut_line_comments(content: str, code: re.Pattern[str]) -> str:
+    """Cut lines after their *code* prefix; only cut lines are rstripped."""
+    match = code.match
+    lines = []
+    for line in content.splitlines():
+        # The pattern can match empty, so match() never returns None here.
+        end = match(line).end()  # type: ignore[union-attr]
+        lines.append(line[:end].rstrip() if end < len(line) else line)
+    return "\n".join(lines)
+
+
+def _strip_dash_comments(content: str) -> str:
+    """Strip ``--`` line comments, ignoring markers inside strings."""
+    return _cut_line_comments(content, _DASH_CODE_RE)
+
+
+# Block comments of SQL, Lua and Haskell, removed before line comments.
+# Unrolled like _HTML_COMMENT_RE: runs that cannot start the terminator are
+# consumed whole instead of one lazy ``.*?`` step per character.
+_SQL_BLOCK_RE = re.compile(r"/\*[^*]*\*+(?:[^*/][^*]*\*+)*/")
+_LUA_BLOCK_RE = re.compile(r"--\[\[[^\]]*(?:\](?!\])[^\]]*)*\]\]")
+_HASKELL_BLOCK_RE = re.compile(r"\{-[^-]*(?:-(?!\})[^-]*)*-\}")
+
+
+# SQL code before a ``--`` comment. There are no backslash escapes; a quote
+# inside a string is escaped by doubling it, and strings end at the line.
+_SQL_CODE_RE = re.compile(
+    r"""(?:[^'"-]+|-(?!-)|'[^']*(?:''[^']*)*'?|"[^"]*(?:""[^"]*)*"?)*"""
+)
 
 
 def _strip_sql_comments(content: str) -> str:
     """Strip SQL -- and /* */ comments."""
     # Remove /* */ comments
-    content = re.sub(r"/\*.*?\*/", "", content, flags=re.DOTALL)
+    content = _SQL_BLOCK_RE.sub("", content)
     # Remove -- comments, taking care not to strip inside string literals
-    lines = []
-    for line in content.splitlines():
-        lines.append(_strip_sql_line_comment(line))
-    return "\n".join(lines)
+    return _cut_line_comments(content, _SQL_CODE_RE)
 
 
 def _strip_lua_comments(content: str) -> str:
     """Strip Lua -- and --[[ ]] comments."""
     # Remove --[[ ]] comments
-    content = re.sub(r"--\[\[.*?\]\]", "", content, flags=re.DOTALL)
+    content = _LUA_BLOCK_RE.sub("", content)
     # Remove -- comments outside of string literals
-    lines = []
-    for line in content.splitlines():
-        lines.append(_strip_line_comment(line, "--"))
-    return "\n".join(lines)
+    return _strip_dash_comments(content)
 
 
 def _strip_haskell_comments(content: str) -> str:
     """Strip Haskell -- and {- -} comments."""
     # Remove {- -} comments
-    content = re.sub(r"\{-.*?-\}", "", content, flags=re.DOTALL)
+    content = _HASKELL_BLOCK_RE.sub("", content)
     # Remove -- comments outside of string/char literals
-    lines = []
-    for line in content.splitlines():
-        lines.append(_strip_line_comment(line, "--"))
-    return "\n".join(lines)
+    return _strip_dash_comments(content)
 
 
 def _strip_lisp_comments(content: str) -> str:
     """Strip Lisp ; comments, preserving string literals."""
-    lines = []
-    for line in content.splitlines():
-        in_string = False
-        escape = False
-        result: list[str] = []
-        i = 0
-        while i < len(line):
-            char = line[i]
-            # Handle escape sequences
-            if escape:
-                result.append(char)
-                escape = False
-                i += 1
-                continue
-            # Start escape sequence
-            if char == "\\" and in_string:
-                result.append(char)
-                escape = True
-                i += 1
-                continue
-            # Toggle string state on unescaped double quotes
-            if char == '"':
-                in_string = not in_string
-                result.append(char)
-            elif char == ";" and not in_string:
-                # Start of comment outside a string; ignore rest of line
-                break
-            else:
-                result.append(char)
-            i += 1
-        lines.append("".join(result).rstrip())
-    return "\n".join(lines)
+    return _strip_line_comments_re(content, _LISP_CODE_RE)
+
+
+_STRIPPER_GROUPS: List[Tuple[Callable[[str], str], Tuple[str, ...]]] = [
+    # Languages with # comments (Python, Ruby, Shell, YAML, etc.)
+    (
+        _strip_hash_comments,
+        (
+            ".py",
+            ".pyw",
+            ".rb",
+            ".sh",
+            ".bash",
+            ".zsh",
+            ".yml",
+            ".yaml",
+            ".toml",
+            ".conf",
+            ".ini",
+            ".r",
+            ".pl",
+            ".tcl",
+        ),
+    ),
+    # Languages with // and /* */ comments
+    # (C-style: C, C++, Java, JavaScript, Go, Rust, etc.)
+    (
+        _strip_c_style_comments,
+        (
+            ".c",
+            ".h",
+            ".cpp",
+            ".hpp",
+            ".cc",
+            ".cxx",
+            ".java",
+            ".js",
+            ".jsx",
+            ".ts",
+            ".tsx",
+            ".go",
+            ".rs",
+            ".cs",
+            ".swift",
+            ".kt",
+            ".kts",
+            ".scala",
+            ".m",
+            ".mm",
+            ".php",
+            ".dart",
+        ),
+    ),
+    # HTML/XML
+    (_strip_html_comments, (".html", ".htm", ".xml", ".svg", ".xhtml")),
+    # CSS
+    (_strip_css_comments, (".css", ".scss", ".sass", ".less")),
+    (_strip_sql_comments, (".sql",)),
+    (_strip_lua_comments, (".lua",)),
+    (_strip_haskell_comments, (".hs", ".lhs")),
+    # Lisp-family
+    (_strip_lisp_comments, (".lisp", ".cl", ".el", ".scm", ".clj", ".cljs")),
+]
+
+# Extension -> stripper, so strip_comments dispatches with one dict lookup.
+_STRIPPERS: Dict[str, Callable[[str], str]] = {
+    ext: stripper for stripper, exts in _STRIPPER_GROUPS for ext in exts
+}
@@ -4,29 +4,63 @@ from __future__ import annotations
 
 import fnmatch
 import os
+import re
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable, List
+from typing import Deque, Iterable, Iterator, List, Optional, Tuple
 
 import pathspec
 
-from .utils import is_binary_path
+from .utils import classify_paths
 
 DEFAULT_MAX_SIZE = 1_048_576
+# A .gitignore in effect during the walk: the relative prefix of its
+# directory, its rules, and one regex that finds any path a rule could name.
+# The regex is None when the rules cannot be fused and are tried one by one.
+_IgnoreLayer = Tuple[str, List[pathspec.Pattern], Optional[re.Pattern[str]]]
+# How pathspec starts the regex of a gitignore rule without a leading "/".
+_ANY_DIR = "^(?:.+/)?"
+# Characters that make a pattern a glob rather than a literal path.
+_GLOB_CHARS = frozenset("*?[")
+# Candidate files are sniffed for binary content this many at a time.
+_CLASSIFY_BATCH = 128
 
 
-def _load_gitignore_spec(root: Path) -> pathspec.PathSpec | None:
-    """Load and parse .gitignore file from the root directory.
-    
+def _fusable_layout() -> bool:
+    """Return True if pathspec compiles rules the way :func:`_ignore_layer` expects.
+
+    That is the pathspec 1.x layout: unanchored rules start with ``_ANY_DIR``
+    and the only named group is ``ps_d``.
+    """
+    try:
+        loose, folder = pathspec.GitIgnoreSpec.from_lines(["*.log", "build/"]).patterns
+        return (
+            loose.regex.pattern.startswith(_ANY_DIR)
+            and set(folder.regex.groupindex) == {"ps_d"}
+        )
+    except Exception:
+        return False
+
+
+# Checked once at import; other layouts skip the fused prefilter.
+_FUSABLE_LAYOUT = _fusable_layout()
+
+
+def _load_gitignore_spec(root: Path) -> pathspec.GitIgnoreSpec | None:
+    """Load and parse the .gitignore file of a directory.
+
     Parameters
     ----------
     root:
-        Root directory to look for .gitignore file.
-        
+        Directory to look for .gitignore file.
+
     Returns
     -------
-    pathspec.PathSpec or None:
-        A PathSpec object if .gitignore exists, None otherwise.
+    pathspec.GitIgnoreSpec or None:
+        A GitIgnoreSpec if .gitignore exists, None otherwise.
     """
     gitignore_path = root / ".gitignore"
     if not gitignore_path.exists():
@@ -35,18 +69,141 @@ def _load_gitignore_spec(root: Path) -> pathspec.PathSpec | None:
     try:
         with open(gitignore_path, "r", encoding="utf-8", errors="replace") as f:
             lines = f.read().splitlines()
-        return pathspec.PathSpec.from_lines("gitwildmatch", lines)
+        return pathspec.GitIgnoreSpec.from_lines(lines)
     except (OSError, UnicodeDecodeError):
         return None
 
 
-@dataclass
+def _compile_globs(patterns: Iterable[str]) -> re.Pattern[str] | None:
+    """Fuse fnmatch *patterns* into one regex; None when there are none.
+
+    ``match`` on the result is equivalent to any pattern fnmatch-ing.
+    """
+    patterns = list(patterns)
+    if not patterns:
+        return None
+    # fnmatch normalises case where the platform does (Windows).
+    flags = re.IGNORECASE if os.path.normcase("A") == "a" else 0
+    return re.compile("|".join(fnmatch.translate(p) for p in patterns), flags)
+
+
+@lru_cache(maxsize=1024)
+def _ending_at_end(regex: str) -> re.Pattern[str]:
+    """Compile *regex* so that it only matches when it reaches the end."""
+    return re.compile(f"(?:{regex})\\Z")
+
+
+def _names_path(pattern: pathspec.Pattern, path: str) -> bool:
+    """Return True if a gitignore *pattern* matches *path* itself.
+
+    pathspec's patterns also match everything below a matching directory.
+    That is skipped here, since the walker already decides each directory
+    before descending. Directories are passed with a trailing "/". This reads
+    the regex layout of pathspec 1.x (its ``ps_d`` group), which is why
+    pathspec 1.0 is the minimum supported version.
+    """
+    regex = pattern.regex
+    if regex is None or regex.search(path) is None:
+        return False
+    source = getattr(pattern, "pattern", "") or ""
+    if "ps_d" not in regex.groupindex:
+        # "dir/**" compiles to a bare "dir/" prefix (and "**" to "."): it
+        # names everything below dir, but not dir itself.
+        match = regex.search(path)
+        return not (path.endswith("/") and match.end() == len(path))
+    if source.endswith("/**/"):
+        # "dir/**/" names the directories inside dir, not dir itself.
+        return path.endswith("/") and not _ending_at_end(regex.pattern).search(path)
+    return _ending_at_end(regex.pattern).search(path) is not None
+
+
+def _ignore_layer(prefix: str, spec: pathspec.GitIgnoreSpec) -> List[_IgnoreLayer]:
+    """Return the walk layer for *spec*, or nothing when it has no rules."""
+    patterns = [
+        p for p in spec.patterns if p.include is not None and p.regex is not None
+    ]
+    if not patterns:
+        return []
+    # Every rule's regex fused into one search, so paths that no rule touches
+    # (the vast majority) cost a single C-level scan instead of a Python loop
+    # over the rules. The named group pathspec adds would repeat, so it is
+    # made anonymous. Unanchored rules share their "^(?:.+/)?" prefix as
+    # "(?:^|/)", which tries each component start once rather than
+    # backtracking over every split of the path for every rule.
+    # Any other layout, or a rule with other named groups, skips the
+    # prefilter rather than risk a wrong one.
+    if not _FUSABLE_LAYOUT or any(
+        set(p.regex.groupindex) - {"ps_d"} for p in patterns
+    ):
+        return [(prefix, patterns, None)]
+    anywhere, anchored = [], []
+    for p in patterns:
+        regex = p.regex.pattern.replace("(?P<ps_d>", "(?:")
+        if regex.startswith(_ANY_DIR):
+            anywhere.append(regex[len(_ANY_DIR) :])
+        else:
+            anchored.append(regex)
+    if anywhere:
+        anchored.append("(?:^|/)(?:" + "|".join(anywhere) + ")")
+    fused = "|".join(f"(?:{regex})" for regex in anchored)
+    try:
+        return [(prefix, patterns, re.compile(fused))]
+    except re.error:
+        return [(prefix, patterns, None)]
+
+
+@dataclass(slots=True)
 class FileInfo:
-    """Metadata about a file in the repository."""
+    """Metadata about a file in the repository.
+
+    ``mtime_ns``, ``ctime_ns`` and ``ino`` let caches notice a rewrite that
+    keeps the size and the (coarse) float mtime; they are 0 when unknown.
+    """
 
     path: Path
     size: int
     mtime: float
+    mtime_ns: int = 0
+    ctime_ns: int = 0
+    ino: int = 0
+
+
+def _classify_batch(
+    batch: List[Tuple[os.DirEntry[str], str]], max_size: int, strict: bool
+) -> List[FileInfo]:
+    """Return FileInfo for the readable, small enough, non-binary entries.
+
+    *batch* holds ``(entry, relative path)`` pairs; order is preserved.
+    Paths stay plain strings until a file is known to be kept.
+    """
+    kept: List[Tuple[str, str, os.stat_result]] = []
+    for entry, rel in batch:
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        if stat.st_size > max_size:
+            continue
+        if not os.access(entry.path, os.R_OK):
+            continue
+        kept.append((entry.path, rel, stat))
+    binary = classify_paths(
+        [full for full, _, _ in kept],
+        strict=strict,
+        stats=[stat for _, _, stat in kept],
+    )
+    return [
+        FileInfo(
+            path=Path(rel),
+            size=stat.st_size,
+            mtime=stat.st_mtime,
+            mtime_ns=stat.st_mtime_ns,
+            ctime_ns=stat.st_ctime_ns,
+            ino=stat.st_ino,
+        )
+        for (_, rel, stat), skip in zip(kept, binary)
+        if not skip
+    ]
 
 
 def collect_files(
@@ -60,6 +217,35 @@ def collect_files(
 ) -> List[FileInfo]:
     """Return list of readable, non-binary files under *path*.
 
+    See :func:`iter_files` for the parameters.
+    """
+    return list(
+        iter_files(
+            path,
+            include,
+            exclude,
+            max_size,
+            binary_strict=binary_strict,
+            respect_gitignore=respect_gitignore,
+        )
+    )
+
+
+def iter_files(
+    path: Path,
+    include: Iterable[str] | None = None,
+    exclude: Iterable[str] | None = None,
+    max_size: int = DEFAULT_MAX_SIZE,
+    *,
+    binary_strict: bool = True,
+    respect_gitignore: bool = True,
+) -> Iterator[FileInfo]:
+    """Yield readable, non-binary files under *path* in walk order.
+
+    Files are yielded as soon as their batch has been classified, so
+    callers can start on the first files while the walk continues.
+    Closing the generator early stops the walk.
+
     Parameters
     ----------
     path:
@@ -77,13 +263,7 @@ def collect_files(
     """
     include = list(include or ["*"])
     exclude = list(exclude or [])
-    files: List[FileInfo] = []
     root = Path(path)
-    
-    # Load .gitignore if respect_gitignore is True
-    gitignore_spec = None
-    if respect_gitignore:
-        gitignore_spec = _load_gitignore_spec(root)
 
     def _expand(pattern: str) -> str:
         # normalize platform separators and leading prefixes
@@ -107,27 +287,111 @@ def collect_files(
         if not git_included:
             exclude.append(".git/**")
 
-    for file in root.rglob("*"):
-        try:
-            rel = file.relative_to(root)
-            rel_path = str(rel).replace("\\", "/")
-            if not file.is_file():
-                continue
-            if not any(fnmatch.fnmatch(rel_path, pattern) for pattern in include):
-                continue
-            if any(fnmatch.fnmatch(rel_path, pattern) for pattern in exclude):
-                continue
-            # Check gitignore rules
-            if gitignore_spec and gitignore_spec.match_file(rel_path):
-                continue
-            if is_binary_path(file, strict=binary_strict):
-                continue
-            stat = file.stat()
-            if not os.access(file, os.R_OK):
-                continue
-            if stat.st_size > max_size:
+    # A directory is skipped without descending when an exclude pattern is
+    # "<dir glob>/**" or when it is gitignored; as in git, files inside an
+    # ignored directory cannot be re-included.
+    dir_globs = [pat[:-3] for pat in exclude if pat.endswith("/**")]
+    # Literal directories (".git", "node_modules") are a set lookup; only the
+    # globbed ones go through the fused regex.
+    pruned_dirs = frozenset(
+        os.path.normcase(d) for d in dir_globs if not _GLOB_CHARS.intersection(d)
+    )
+    dir_re = _compile_globs(d for d in dir_globs if _GLOB_CHARS.intersection(d))
+    # "**" (the expanded "*") matches everything; skip the test altogether.
+    include_re = None if "**" in include else _compile_globs(include)
+    exclude_re = _compile_globs(exclude)
+
+    def _layer(directory: Path, prefix: str) -> List[_IgnoreLayer]:
+        spec = _load_gitignore_spec(directory) if respect_gitignore else None
+        return [] if spec is None else _ignore_layer(prefix, spec)
+
+    def _ignored(rel_path: str, layers: List[_IgnoreLayer]) -> bool:
+        # Like git, the last matching rule wins and a deeper .gitignore
+        # overrides outer ones. Directories ("dir/") are tested on the way
+        # down, so only rules naming the path itself count.
+        ignored = False
+        for prefix, patterns, fused in layers:
+            sub = rel_path[len(prefix) :]
+            if fused is not None and fused.search(sub) is None:
                 continue
-            files.append(FileInfo(path=rel, size=stat.st_size, mtime=stat.st_mtime))
+            for pattern in patterns:
+                if _names_path(pattern, sub):
+                    ignored = pattern.include
+        return ignored
+
+    def _pruned(rel_dir: str, layers: List[_IgnoreLayer]) -> bool:
+        if pruned_dirs and os.path.normcase(rel_dir) in pruned_dirs:
+            return True
+        if dir_re is not None and dir_re.match(rel_dir):
+            return True
+        return bool(layers) and _ignored(rel_dir + "/", layers)
+
+    pending: List[Tuple[os.DirEntry[str], str]] = []
+    batches: Deque[Future[List[FileInfo]]] = deque()
+    pool: ThreadPoolExecutor | None = None
+
+    def _flush() -> None:
+        nonlocal pool
+        # stat() and the sniffing reads release the GIL, so several batches
+        # overlap their syscalls. The pool only starts once a batch fills.
+        if pool is None:
+            pool = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4))
+        batches.append(
+            pool.submit(_classify_batch, pending[:], max_size, binary_strict)
+        )
+        pending.clear()
+
+    def _ready() -> Iterator[FileInfo]:
+        # Finished batches are handed out once they are next in walk order.
+        while batches and batches[0].done():
+            yield from batches.popleft().result()
+
+    def _walk(
+        directory: str, prefix: str, layers: List[_IgnoreLayer]
+    ) -> Iterator[FileInfo]:
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
         except OSError:
-            continue
-    return files
+            return
+        if prefix and any(entry.name == ".gitignore" for entry in entries):
+            layers = layers + _layer(Path(directory), prefix)
+        subdirs = []
+        for entry in entries:
+            try:
+                # Like rglob, descend into real directories only.
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry)
+                    continue
+                if not entry.is_file():
+                    continue
+                rel = prefix + entry.name
+                rel_path = rel.replace("\\", "/")
+                if include_re is not None and not include_re.match(rel_path):
+                    continue
+                if exclude_re is not None and exclude_re.match(rel_path):
+                    continue
+                # Check gitignore rules
+                if layers and _ignored(rel_path, layers):
+                    continue
+            except OSError:
+                continue
+            pending.append((entry, rel))
+            if len(pending) >= _CLASSIFY_BATCH:
+                _flush()
+                yield from _ready()
+        # Files of a directory come before its subdirectories, as with rglob.
+        for entry in subdirs:
+            rel = prefix + entry.name
+            if not _pruned(rel.replace("\\", "/"), layers):
+                yield from _walk(entry.path, rel + "/", layers)
+
+    try:
+        yield from _walk(str(root), "", _layer(root, ""))
+        # Batches are drained in submission order, so files keep walk order.
+        while batches:
+            yield from batches.popleft().result()
+        yield from _classify_batch(pending, max_size, binary_strict)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
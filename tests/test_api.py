@@ -26,3 +26,12 @@ def test_dump_repo_exclude_comments_json(tmp_path: Path):
     content = data["files"][0]["contents"]
     assert "// Comment" not in content
     assert "const x = 5;" in content
+
+
+def test_looks_remote():
+    from uithub_local.api import _looks_remote
+
+    assert _looks_remote("https://github.com/foo/bar")
+    assert _looks_remote("git@github.com:foo/bar.git")
+    assert not _looks_remote("foo/bar")
+    assert not _looks_remote(Path("https:/x"))
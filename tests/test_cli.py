@@ -75,7 +75,7 @@ def test_cli_remote(tmp_path: Path):
         zf.writestr("repo/file.txt", "hi")
     responses.add(
         responses.GET,
-        "https://api.github.com/repos/foo/bar/zipball",
+        "https://codeload.github.com/foo/bar/tar.gz/HEAD",
         body=data.getvalue(),
         status=200,
         content_type="application/zip",
@@ -107,6 +107,19 @@ def test_cli_html(tmp_path: Path):
     assert "<details class='file-card'>" in result.output
 
 
+def test_cli_json_dedupe(tmp_path: Path):
+    import json
+
+    (tmp_path / "a.txt").write_text("same")
+    (tmp_path / "b.txt").write_text("same")
+    runner = CliRunner()
+    result = runner.invoke(main, [str(tmp_path), "--format", "json", "--dedupe"])
+    assert result.exit_code == 0
+    data = json.loads(result.output)
+    assert list(data["blobs"].values()) == ["same"]
+    assert {f["contents_ref"] for f in data["files"]} == set(data["blobs"])
+
+
 def test_cli_exclude_directory(tmp_path: Path):
     (tmp_path / ".git").mkdir()
     (tmp_path / ".git" / "data").write_text("x")
@@ -312,3 +325,20 @@ def test_cli_requires_path_source():
     result = runner.invoke(main, [])
     assert result.exit_code == 2
     assert "One of PATH, --local-path, or --remote-url is required" in result.output
+
+
+def test_cli_help_skips_heavy_imports():
+    import subprocess
+    import sys
+
+    code = (
+        "import sys\n"
+        "from click.testing import CliRunner\n"
+        "from uithub_local.cli import main\n"
+        "CliRunner().invoke(main, ['--help'])\n"
+        "print('requests' in sys.modules, 'uithub_local.renderer' in sys.modules)\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert out.stdout.split() == ["False", "False"]
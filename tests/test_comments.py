@@ -298,3 +298,58 @@ def test_css_escaped_quotes():
     result = strip_comments(content, Path("test.css"))
     assert 'test\\"quote' in result
     assert "/* comment */" not in result
+
+
+def test_c_style_unterminated_string():
+    """An unterminated string keeps everything after it, comments included."""
+    content = 'a = 1; // gone\nb = "open // kept\n/* kept */'
+    result = strip_comments(content, Path("test.js"))
+    assert result == 'a = 1; \nb = "open // kept\n/* kept */'
+    assert strip_comments('s = "\\', Path("test.c")) == 's = "\\'
+
+
+def test_dash_comments_escapes_and_single_dash():
+    """Backslash escapes a dash too, and only changed lines are rstripped."""
+    content = "x = 1 - 2   \nprint('--') -- note\ny = a\\--b\nz = 3 --"
+    result = strip_comments(content, Path("test.lua"))
+    assert result == "x = 1 - 2   \nprint('--')\ny = a\\--b\nz = 3"
+    css = "a { b: 'x/*y' } /* open"
+    assert strip_comments(css, Path("test.css")) == "a { b: 'x/*y' } "
+
+
+def test_html_comment_dash_runs():
+    """Dashes inside a comment don't end it early; ``--->`` closes it."""
+    content = "a<!-- x - y -- z --->b<!---->c<!--->d"
+    assert strip_comments(content, Path("t.html")) == "abc<!--->d"
+
+
+def test_c_style_escaped_backslash():
+    """A string ending in an escaped backslash closes before the comment."""
+    content = r"""s = "a\\"; // gone
+t = '\\'; /* gone */ u = "\\\"" // gone"""
+    result = strip_comments(content, Path("test.c"))
+    assert result == r"""s = "a\\"; 
+t = '\\';  u = "\\\"" """
+
+
+def test_block_comment_star_and_bracket_runs():
+    """Runs of closing characters inside block comments end them correctly."""
+    assert strip_comments("a/***x**/b/* open **", Path("t.c")) == "ab"
+    assert strip_comments("a/**/b/***/c", Path("t.sql")) == "abc"
+    assert strip_comments("a--[[ ] ]x]]]b", Path("t.lua")) == "a]b"
+    assert strip_comments("a{- - } -}}b{--}", Path("t.hs")) == "a}b"
+
+
+def test_strip_comments_reuses_result_for_duplicate_content(monkeypatch):
+    from uithub_local import utils
+
+    utils._strip_cached.cache_clear()
+    content = "x = 1  # note\n"
+    assert strip_comments(content, Path("a.py")) == "x = 1"
+    assert strip_comments(content, Path("b/c.PY")) == "x = 1"
+    assert strip_comments(content, Path("a.rb")) == "x = 1"
+    info = utils._strip_cached.cache_info()
+    assert (info.hits, info.misses) == (1, 2)
+    monkeypatch.setattr(utils, "_STRIP_CACHE_MAX_CHARS", 4)
+    assert strip_comments(content, Path("a.py")) == "x = 1"
+    assert utils._strip_cached.cache_info().hits == 1
@@ -1,4 +1,5 @@
 import io
+import tarfile
 import zipfile
 
 import responses
@@ -7,20 +8,29 @@ import pytest
 from uithub_local.downloader import download_repo, _archive_url
 
 
+def _tarball(files: dict[str, str]) -> bytes:
+    data = io.BytesIO()
+    with tarfile.open(fileobj=data, mode="w:gz") as tar:
+        for name, text in files.items():
+            raw = text.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(raw)
+            tar.addfile(info, io.BytesIO(raw))
+    return data.getvalue()
+
+
 @responses.activate
 def test_download_repo(tmp_path):
-    data = io.BytesIO()
-    with zipfile.ZipFile(data, "w") as zf:
-        zf.writestr("repo/file.txt", "hello")
     responses.add(
         responses.GET,
-        "https://api.github.com/repos/foo/bar/zipball",
-        body=data.getvalue(),
+        "https://codeload.github.com/foo/bar/tar.gz/HEAD",
+        body=_tarball({"repo/file.txt": "hello", "../evil.txt": "x"}),
         status=200,
-        content_type="application/zip",
+        content_type="application/x-gzip",
     )
     with download_repo("https://github.com/foo/bar") as path:
         assert (path / "file.txt").read_text() == "hello"
+        assert not (path.parent.parent / "evil.txt").exists()
 
 
 @responses.activate
@@ -30,7 +40,7 @@ def test_download_repo_with_token():
         zf.writestr("repo/f.txt", "x")
     responses.add(
         responses.GET,
-        "https://api.github.com/repos/foo/bar/zipball",
+        "https://api.github.com/repos/foo/bar/tarball",
         body=data.getvalue(),
         status=200,
         content_type="application/zip",
@@ -44,7 +54,7 @@ def test_download_repo_gitlab_retry(tmp_path):
     data = io.BytesIO()
     with zipfile.ZipFile(data, "w") as zf:
         zf.writestr("repo/g.txt", "hi")
-    url = "https://gitlab.com/foo/bar/-/archive/master/bar-master.zip"
+    url = "https://gitlab.com/foo/bar/-/archive/master/bar-master.tar.gz"
     responses.add(responses.GET, url, status=500)
     responses.add(
         responses.GET,
@@ -65,11 +75,203 @@ def test_archive_url_invalid():
 
 def test_archive_url_gitlab_and_zip():
     gitlab = _archive_url("https://gitlab.com/foo/bar")
-    assert gitlab == "https://gitlab.com/foo/bar/-/archive/master/bar-master.zip"
+    assert gitlab == (
+        "https://gitlab.com/foo/bar/-/archive/master/bar-master.tar.gz",
+        None,
+    )
+    gitlab_zip = _archive_url("https://gitlab.com/foo/bar", prefer_tar=False)
+    assert gitlab_zip == (
+        "https://gitlab.com/foo/bar/-/archive/master/bar-master.zip",
+        None,
+    )
     direct = _archive_url("https://example.com/archive.zip")
-    assert direct == "https://example.com/archive.zip"
+    assert direct == ("https://example.com/archive.zip", None)
 
 
 def test_archive_url_scp_style():
     url = _archive_url("git@github.com:foo/bar.git")
-    assert url == "https://api.github.com/repos/foo/bar/zipball"
+    assert url == ("https://codeload.github.com/foo/bar/tar.gz/HEAD", None)
+
+
+def test_archive_url_github_tree():
+    url = "https://github.com/foo/bar/tree/dev/docs/api"
+    assert _archive_url(url) == (
+        "https://codeload.github.com/foo/bar/tar.gz/dev",
+        "docs/api",
+    )
+    assert _archive_url(url, private=True) == (
+        "https://api.github.com/repos/foo/bar/tarball/dev",
+        "docs/api",
+    )
+    assert _archive_url("foo/bar", private=True, prefer_tar=False) == (
+        "https://api.github.com/repos/foo/bar/zipball",
+        None,
+    )
+
+
+def test_extract_zip_parallel(tmp_path, monkeypatch):
+    from uithub_local import downloader
+
+    data = io.BytesIO()
+    with zipfile.ZipFile(data, "w") as zf:
+        for i in range(200):
+            zf.writestr(f"repo/pkg{i % 7}/f{i}.txt", str(i))
+    monkeypatch.setattr(downloader.os, "cpu_count", lambda: 4)
+    with zipfile.ZipFile(data) as zf:
+        downloader._extract_zip(zf, str(tmp_path))
+    assert (tmp_path / "repo" / "pkg3" / "f10.txt").read_text() == "10"
+    assert len(list(tmp_path.rglob("*.txt"))) == 200
+
+
+def test_extract_libarchive(tmp_path):
+    pytest.importorskip("libarchive")
+    from uithub_local import downloader
+
+    data = io.BytesIO()
+    with zipfile.ZipFile(data, "w") as zf:
+        zf.writestr("repo/sub/a.txt", "alpha")
+        zf.writestr("../evil.txt", "nope")
+    data.seek(0)
+    downloader._extract_libarchive(data, str(tmp_path / "out"))
+    assert (tmp_path / "out" / "repo" / "sub" / "a.txt").read_text() == "alpha"
+    assert (tmp_path / "out" / "evil.txt").read_text() == "nope"
+    assert not (tmp_path / "evil.txt").exists()
+
+
+@responses.activate
+def test_download_repo_etag_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setenv("UITHUB_LOCAL_CACHE", "1")
+    data = io.BytesIO()
+    with zipfile.ZipFile(data, "w") as zf:
+        zf.writestr("repo/file.txt", "cached")
+    url = "https://example.com/archive.zip"
+    responses.add(
+        responses.GET,
+        url,
+        body=data.getvalue(),
+        status=200,
+        headers={"ETag": '"v1"'},
+    )
+    responses.add(responses.GET, url, status=304)
+
+    with download_repo(url) as first:
+        assert (first / "file.txt").read_text() == "cached"
+    with download_repo(url) as second:
+        assert second == first
+        assert (second / "file.txt").read_text() == "cached"
+    assert responses.calls[1].request.headers["If-None-Match"] == '"v1"'
+
+
+def _zip(text: str) -> bytes:
+    data = io.BytesIO()
+    with zipfile.ZipFile(data, "w") as zf:
+        zf.writestr("repo/file.txt", text)
+    return data.getvalue()
+
+
+@responses.activate
+def test_download_repo_cache_is_opt_in(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.delenv("UITHUB_LOCAL_CACHE", raising=False)
+    url = "https://example.com/archive.zip"
+    responses.add(
+        responses.GET, url, body=_zip("x"), status=200, headers={"ETag": '"v1"'}
+    )
+
+    with download_repo(url) as root:
+        assert (root / "file.txt").read_text() == "x"
+    assert "If-None-Match" not in responses.calls[0].request.headers
+    assert not (tmp_path / "cache").exists()
+
+
+@responses.activate
+def test_download_repo_cache_keeps_replaced_tree_until_released(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    url = "https://example.com/archive.zip"
+    responses.add(
+        responses.GET, url, body=_zip("old"), status=200, headers={"ETag": '"v1"'}
+    )
+    responses.add(responses.GET, url, status=304)
+    responses.add(
+        responses.GET, url, body=_zip("new"), status=200, headers={"ETag": '"v2"'}
+    )
+
+    with download_repo(url, use_cache=True):
+        pass
+    with download_repo(url, use_cache=True) as reader:
+        with download_repo(url, use_cache=True) as fresh:
+            assert (fresh / "file.txt").read_text() == "new"
+        assert (reader / "file.txt").read_text() == "old"
+    assert not reader.exists()
+    assert fresh.exists()
+
+
+@responses.activate
+def test_download_repo_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setenv("UITHUB_LOCAL_CACHE_MAX_BYTES", "10")
+    first_url = "https://example.com/first.zip"
+    second_url = "https://example.com/second.zip"
+    for url, tag in ((first_url, '"a"'), (second_url, '"b"')):
+        responses.add(
+            responses.GET, url, body=_zip("12345678"), status=200, headers={"ETag": tag}
+        )
+
+    with download_repo(first_url, use_cache=True) as first:
+        pass
+    with download_repo(second_url, use_cache=True) as second:
+        pass
+    assert not first.exists()
+    assert (second / "file.txt").read_text() == "12345678"
+
+
+def test_extract_stream_unzip(tmp_path):
+    pytest.importorskip("stream_unzip")
+    from uithub_local import downloader
+
+    data = io.BytesIO()
+    with zipfile.ZipFile(data, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("repo/", "")
+        zf.writestr("repo/pkg/a.txt", "alpha" * 1000)
+        zf.writestr("../evil.txt", "nope")
+    payload = data.getvalue()
+    chunks = (payload[i : i + 100] for i in range(0, len(payload), 100))
+    downloader._extract_stream_unzip(downloader._prefetch(chunks), str(tmp_path))
+    assert (tmp_path / "repo" / "pkg" / "a.txt").read_text() == "alpha" * 1000
+    assert (tmp_path / "evil.txt").read_text() == "nope"
+
+
+def test_prefetch_propagates_errors():
+    from uithub_local.downloader import _prefetch
+
+    def chunks():
+        yield b"a"
+        raise OSError("boom")
+
+    reader = _prefetch(chunks())
+    assert next(reader) == b"a"
+    with pytest.raises(OSError):
+        next(reader)
+
+
+def test_scratch_dir_requires_free_space(tmp_path, monkeypatch):
+    from uithub_local import downloader
+
+    monkeypatch.setattr(downloader, "_SHM_DIR", str(tmp_path))
+    monkeypatch.setattr(downloader, "_SHM_MIN_FREE", 0)
+    assert downloader._scratch_dir(1) == str(tmp_path)
+    assert downloader._scratch_dir(1 << 62) is None
+    monkeypatch.setattr(downloader, "_SHM_DIR", str(tmp_path / "missing"))
+    assert downloader._scratch_dir(None) is None
+
+
+def test_session_is_per_thread():
+    from concurrent.futures import ThreadPoolExecutor
+
+    from uithub_local.downloader import _session
+
+    assert _session() is _session()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        other = pool.submit(_session).result()
+    assert other is not _session()
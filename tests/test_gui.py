@@ -0,0 +1,24 @@
+import gzip
+
+from uithub_local import gui
+
+
+def test_gui_assets_are_minified_and_precompressed():
+    page = gui.HTML_BYTES.decode("utf-8")
+    assert page.startswith("<!DOCTYPE html>")
+    assert "<!--" not in page
+    assert 'id="dumpForm"' in page
+    assert len(gui.HTML_BYTES) < len(gui.HTML_TEMPLATE.encode("utf-8"))
+    assert gzip.decompress(gui.HTML_GZIP) == gui.HTML_BYTES
+
+
+def test_gui_icons_are_inline():
+    page = gui.HTML_BYTES.decode("utf-8")
+    assert "lucide" not in page
+    assert "<svg" in page
+
+
+def test_gui_styles_are_inline():
+    page = gui.HTML_BYTES.decode("utf-8")
+    assert "tailwindcss" not in page
+    assert ".w-full{" in page.replace(" ", "")
@@ -4,3 +4,41 @@ def test_load_text_success(tmp_path):
     p = tmp_path / "a.txt"
     p.write_text("hi")
     assert load_text(p) == "hi"
+
+
+def test_load_text_skips_binary_and_oversized(tmp_path):
+    from uithub_local.loader import load_text
+
+    blob = tmp_path / "blob.txt"
+    blob.write_bytes(b"abc\x00def")
+    assert load_text(blob) == ""
+
+    big = tmp_path / "big.txt"
+    big.write_text("x" * 100)
+    assert load_text(big, max_bytes=10) == ""
+    assert load_text(big) == "x" * 100
+
+
+def test_load_text_decoding(tmp_path):
+    from uithub_local.loader import load_text
+
+    p = tmp_path / "a.txt"
+    p.write_bytes(b"one\r\ntwo\rthree\xff\n")
+    assert load_text(p) == "one\ntwo\nthree�\n"
+
+
+def test_load_text_large_files(tmp_path):
+    from uithub_local.loader import SNIFF_BYTES, load_text
+
+    big_size = 16 * 1024
+    body = "line é\r\n" * (big_size // 8)
+    big = tmp_path / "big.txt"
+    big.write_bytes(body.encode("utf-8") + b"\xff")
+    assert load_text(big) == body.replace("\r\n", "\n") + "�"
+
+    late_nul = tmp_path / "late.txt"
+    late_nul.write_bytes(b"a" * SNIFF_BYTES + b"\x00" + b"b" * big_size)
+    assert load_text(late_nul).startswith("a" * SNIFF_BYTES)
+    early_nul = tmp_path / "early.txt"
+    early_nul.write_bytes(b"\x00" + b"b" * big_size)
+    assert load_text(early_nul) == ""
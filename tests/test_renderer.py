@@ -72,3 +72,254 @@ def test_render_repo_name_dot(tmp_path: Path, monkeypatch):
     files = collect_files(Path("."), ["*"], [])
     output = render(files, Path("."))
     assert tmp_path.name in output.splitlines()[0]
+
+
+@freeze_time("2024-01-01T00:00:00+00:00")
+def test_render_html_escapes_once(tmp_path: Path):
+    from uithub_local.renderer import Dump
+
+    (tmp_path / "a&b.txt").write_text("<tag>")
+    files = collect_files(tmp_path, ["*"], [])
+    dump = Dump(files, tmp_path)
+    fd = dump.file_dumps[0]
+    assert fd.escaped_path == "a&amp;b.txt"
+    first = dump.as_html("repo")
+    assert fd.escaped_html == "&lt;tag&gt;"
+    cached = fd.escaped_html
+    assert dump.as_html("repo") == first
+    assert fd.escaped_html is cached
+
+
+def test_dump_parallel_load_preserves_order(tmp_path: Path):
+    from uithub_local.renderer import Dump, _PARALLEL_LOAD_MIN
+
+    names = [f"f{i:03}.txt" for i in range(_PARALLEL_LOAD_MIN * 2)]
+    for name in names:
+        (tmp_path / name).write_text(name)
+    files = collect_files(tmp_path, ["*"], [])
+    dump = Dump(files, tmp_path)
+    assert [fd.content for fd in dump.file_dumps] == [f.path.name for f in files]
+
+
+@freeze_time("2024-01-01T00:00:00+00:00")
+@pytest.mark.parametrize("fmt", ["text", "json", "html"])
+def test_iter_renderers_match_join(tmp_path: Path, fmt: str):
+    import json
+
+    from uithub_local.renderer import Dump
+
+    (tmp_path / "a.txt").write_text('quote " and <tag>\n')
+    (tmp_path / "b.txt").write_text("second")
+    dump = Dump(collect_files(tmp_path, ["*"], []), tmp_path)
+    pieces = list(getattr(dump, f"iter_{fmt}")("repo"))
+    assert len(pieces) > 2
+    assert "".join(pieces) == getattr(dump, f"as_{fmt}")("repo")
+    if fmt == "json":
+        doc = json.loads("".join(pieces))
+        assert "".join(pieces) == json.dumps(doc, indent=2)
+        empty = "".join(dump.iter_json("repo", []))
+        assert empty == json.dumps(dict(json.loads(empty)), indent=2)
+
+
+def test_render_html_embeds_minified_style(tmp_path: Path):
+    from uithub_local.renderer import Dump, _HTML_STYLE
+
+    (tmp_path / "a.txt").write_text("hello")
+    dump = Dump(collect_files(tmp_path, ["*"], []), tmp_path)
+    assert "\n" not in _HTML_STYLE
+    assert dump.as_html("repo").count(_HTML_STYLE) == 1
+
+
+def test_renderer_public_surface():
+    from uithub_local import renderer
+
+    assert sorted(renderer.__all__) == [
+        "Dump",
+        "FileDump",
+        "compress",
+        "render",
+        "render_iter",
+        "render_split",
+    ]
+    for name in renderer.__all__:
+        assert hasattr(renderer, name)
+
+
+def test_truncate_drops_largest_first(tmp_path: Path):
+    from uithub_local.renderer import Dump
+
+    for name, size in {"big.txt": 400, "mid.txt": 200, "small.txt": 40}.items():
+        (tmp_path / name).write_text("x " * size)
+    files = collect_files(tmp_path, ["*"], [])
+    full = Dump(files, tmp_path)
+    small = next(fd.tokens for fd in full.file_dumps if fd.path.name == "small.txt")
+    mid = next(fd.tokens for fd in full.file_dumps if fd.path.name == "mid.txt")
+    dump = Dump(files, tmp_path, max_tokens=small + mid)
+    assert sorted(fd.path.name for fd in dump.file_dumps) == ["mid.txt", "small.txt"]
+    assert dump.total_tokens == small + mid
+    assert Dump(files, tmp_path, max_tokens=0).file_dumps == []
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_json_string_escaping(monkeypatch, use_orjson: bool):
+    import json
+
+    from uithub_local import renderer
+
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(renderer, "orjson", None)
+    for value in [
+        'a "quoted"\n\tline\x7f',
+        "café ☃",
+        "line\u2028separator",
+        "bad \udcff name",
+    ]:
+        assert renderer._json_string(value) == json.dumps(value)
+
+
+def test_html_escape_table_matches_stdlib():
+    import html
+
+    from uithub_local.renderer import _HTML_ESCAPES
+
+    sample = "<a href=\"x\">Tom & 'Jerry'</a> ☃"
+    assert sample.translate(_HTML_ESCAPES) == html.escape(sample)
+
+
+def test_duplicate_contents_are_shared_when_loading_in_parallel(tmp_path: Path):
+    from uithub_local import renderer
+
+    count = renderer._PARALLEL_LOAD_MIN * 2 + 8
+    for i in range(count):
+        (tmp_path / f"f{i}.py").write_text("print('same')\n")
+    dump = renderer.Dump(collect_files(tmp_path, ["*"], []), tmp_path)
+    assert len(dump.file_dumps) == count
+    assert len({id(fd.content) for fd in dump.file_dumps}) == 1
+
+
+@freeze_time("2024-01-01T00:00:00+00:00")
+def test_duplicate_contents_are_shared(tmp_path: Path):
+    import json
+
+    from uithub_local.renderer import Dump
+
+    for name in ("a.py", "b.py", "c.py"):
+        (tmp_path / name).write_text("print('same')\n")
+    (tmp_path / "d.py").write_text("print('other')\n")
+    dump = Dump(collect_files(tmp_path, ["*"], []), tmp_path)
+    same = [fd for fd in dump.file_dumps if fd.path.name != "d.py"]
+    assert same[0].content is same[1].content is same[2].content
+    assert len({fd.content_hash for fd in dump.file_dumps}) == 2
+
+    plain = json.loads(dump.as_json("repo"))
+    deduped_text = dump.as_json("repo", dedupe=True)
+    deduped = json.loads(deduped_text)
+    assert deduped_text == json.dumps(deduped, indent=2)
+    assert len(deduped["blobs"]) == 2
+    for entry, full in zip(deduped["files"], plain["files"]):
+        assert deduped["blobs"][entry["contents_ref"]] == full["contents"]
+    empty = dump.as_json("repo", [], dedupe=True)
+    assert json.loads(empty) == {
+        "repo": "repo",
+        "timestamp": "2024-01-01T00:00:00+00:00",
+        "total_tokens": 0,
+        "files": [],
+        "blobs": {},
+    }
+    assert empty == json.dumps(json.loads(empty), indent=2)
+
+
+def test_read_ahead_is_ordered_and_bounded():
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    from uithub_local.renderer import _read_ahead
+
+    lock = threading.Lock()
+    started: list[int] = []
+
+    def work(n):
+        with lock:
+            started.append(n)
+        return str(n)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = _read_ahead(pool, work, range(20), 3)
+        assert next(results) == "0"
+        assert len(started) <= 3
+        assert list(results) == [str(n) for n in range(1, 20)]
+
+
+def test_render_reuses_dump_until_files_change(tmp_path: Path, monkeypatch):
+    import os
+
+    from uithub_local import renderer
+
+    monkeypatch.setattr(renderer, "_DUMP_CACHE", renderer.OrderedDict())
+    built = []
+    real_dump = renderer.Dump
+
+    def counting_dump(*args, **kwargs):
+        built.append(1)
+        return real_dump(*args, **kwargs)
+
+    monkeypatch.setattr(renderer, "Dump", counting_dump)
+    target = tmp_path / "a.txt"
+    target.write_text("hello")
+    files = collect_files(tmp_path, ["*"], [])
+    assert "hello" in render(files, tmp_path)
+    assert "hello" in render(files, tmp_path, fmt="json")
+    assert len(built) == 1
+
+    target.write_text("changed")
+    os.utime(target, (1, 1))
+    files = collect_files(tmp_path, ["*"], [])
+    assert "changed" in render(files, tmp_path)
+    assert len(built) == 2
+    render(files, tmp_path, max_tokens=1000)
+    assert len(built) == 3
+
+    # Same size and mtime: the nanosecond ctime still tells them apart.
+    before = target.stat()
+    target.write_text("CHANGED")
+    os.utime(target, ns=(before.st_atime_ns, before.st_mtime_ns))
+    files = collect_files(tmp_path, ["*"], [])
+    assert "CHANGED" in render(files, tmp_path)
+    assert len(built) == 4
+
+    cached = len(renderer._DUMP_CACHE)
+    assert "CHANGED" in render(files, tmp_path, reuse=False)
+    assert len(built) == 5
+    assert len(renderer._DUMP_CACHE) == cached
+
+
+def test_escaped_html_reuses_clean_content(tmp_path: Path):
+    from uithub_local.renderer import Dump
+
+    (tmp_path / "clean.txt").write_text("nothing special here\n")
+    (tmp_path / "dirty.txt").write_text("a < b\n")
+    dump = Dump(collect_files(tmp_path, ["*"], []), tmp_path)
+    clean, dirty = sorted(dump.file_dumps, key=lambda fd: fd.path_posix)
+    assert clean.escaped_html is clean.content
+    assert dirty.escaped_html == "a &lt; b\n"
+
+
+def test_compress_gzip_round_trips():
+    import gzip
+
+    from uithub_local.renderer import compress
+
+    data = b"hello\n" * 200
+    assert gzip.decompress(compress(data, "gzip")) == data
+    with pytest.raises(ValueError):
+        compress(b"x", "zstd")
+
+
+def test_compress_brotli():
+    brotli = pytest.importorskip("brotli")
+
+    from uithub_local.renderer import compress
+
+    assert brotli.decompress(compress(b"abc" * 100, "br")) == b"abc" * 100
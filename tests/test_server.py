@@ -0,0 +1,245 @@
+import pytest
+import yaml
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from uithub_local import server
+
+
+@pytest.fixture(autouse=True)
+def _empty_response_cache():
+    server._RESPONSE_CACHE.clear()
+    yield
+    server._RESPONSE_CACHE.clear()
+
+
+def test_openapi_yaml_is_cached(tmp_path):
+    server.reset_openapi_cache()
+    client = TestClient(server.app)
+    first = client.get("/openapi.yaml")
+    assert first.status_code == 200
+    assert yaml.safe_load(first.text)["info"]["title"] == "uithub-local API"
+    assert server._openapi_yaml() is server._openapi_yaml()
+    assert client.get("/openapi.yaml").content == first.content
+
+    out = tmp_path / "openapi.yaml"
+    server.save_openapi_spec(out)
+    assert out.read_bytes() == first.content
+
+
+def test_dump_response_compression(monkeypatch):
+    import gzip
+
+    monkeypatch.setattr(server, "dump_repo", lambda url, **kw: "hello\n" * 500)
+    monkeypatch.setattr(
+        server, "dump_repo_iter", lambda url, **kw: iter(["hello\n"] * 500)
+    )
+    client = TestClient(server.app)
+    packed = client.get(
+        "/dump/foo/bar", headers={"Accept-Encoding": "gzip;q=1, br;q=0"}
+    )
+    assert packed.headers["content-encoding"] == "gzip"
+    assert packed.text == "hello\n" * 500
+    assert gzip.decompress(server.compress(b"x" * 2000, "gzip")) == b"x" * 2000
+
+    plain = client.get("/dump/foo/bar", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.text == "hello\n" * 500
+
+
+def test_compressed_dump_reused_from_cache(monkeypatch):
+    calls = []
+    monkeypatch.setattr(server, "dump_repo", lambda url, **kw: "hello\n" * 500)
+    real_compress = server.compress
+
+    def counting_compress(data, encoding):
+        calls.append(encoding)
+        return real_compress(data, encoding)
+
+    monkeypatch.setattr(server, "compress", counting_compress)
+    client = TestClient(server.app)
+    headers = {"Accept-Encoding": "gzip;q=1, br;q=0"}
+    first = client.get("/dump/foo/bar", headers=headers)
+    second = client.get("/dump/foo/bar", headers=headers)
+    assert first.content == second.content == b"hello\n" * 500
+    assert calls == ["gzip"]
+
+
+def test_response_cache_is_capped_by_bytes(monkeypatch):
+    monkeypatch.setattr(server, "_RESPONSE_CACHE_MAX_BYTES", 10)
+    server._response_cache_put("a", "12345")
+    server._response_cache_put("b", "12345")
+    assert list(server._RESPONSE_CACHE) == ["a", "b"]
+    server._response_cache_put("c", "123")
+    assert list(server._RESPONSE_CACHE) == ["b", "c"]
+    server._response_cache_put("huge", "x" * 11)
+    assert "huge" not in server._RESPONSE_CACHE
+    assert server._response_cache_get(None) is None
+
+
+def test_local_dumps_skip_response_cache(tmp_path):
+    (tmp_path / "a.txt").write_text("one")
+    client = TestClient(server.app)
+    resp = client.get("/dump", params={"remote_url": str(tmp_path), "format": "json"})
+    assert resp.json()["status"] == "success"
+    assert not server._RESPONSE_CACHE
+
+
+def test_openapi_yaml_without_ryaml(monkeypatch):
+    import sys
+
+    monkeypatch.setitem(sys.modules, "ryaml", None)
+    server.reset_openapi_cache()
+    try:
+        assert yaml.safe_load(server._openapi_yaml()) == server.app.openapi()
+    finally:
+        server.reset_openapi_cache()
+
+
+def test_openapi_yaml_prebuilt_at_startup():
+    server.reset_openapi_cache()
+    with TestClient(server.app):
+        assert server._openapi_yaml_cache is not None
+
+
+def test_fast_yaml_round_trips():
+    schema = server.app.openapi()
+    assert yaml.safe_load(server._fast_yaml(schema)) == schema
+    sample = {
+        "a": [[1, [2, {}]], {"x": None, "y": [True, 1.5, float("inf")]}],
+        "b": 'é \n\t "q" \\ ☃ yes',
+        "c": {},
+        "d": [],
+        "1": "null",
+        "e": [1e-05, -2e20, 1.5e-300, 0.5],
+        "ctl": "\x01 del\x7f nel\x85 ls\u2028 ps\u2029 bom\ufeff",
+    }
+    assert yaml.safe_load(server._fast_yaml(sample)) == sample
+
+
+def test_dump_streams_uncompressed(tmp_path):
+    (tmp_path / "a.py").write_text("print('a')\n")
+    (tmp_path / "b.txt").write_text("bee\n")
+    from uithub_local.api import dump_repo, dump_repo_iter
+
+    joined = "".join(dump_repo_iter(tmp_path))
+    assert joined.split("\n", 1)[1] == dump_repo(tmp_path).split("\n", 1)[1]
+
+    client = TestClient(server.app)
+    resp = client.get(
+        "/dump",
+        params={"remote_url": str(tmp_path)},
+        headers={"Accept-Encoding": "identity"},
+    )
+    assert resp.status_code == 200
+    assert "content-length" not in resp.headers
+    assert "### a.py" in resp.text and "bee" in resp.text
+
+    missing = client.get(
+        "/dump",
+        params={"remote_url": "https://example.com/x.txt"},
+        headers={"Accept-Encoding": "identity"},
+    )
+    assert missing.status_code == 500
+
+
+def test_dump_does_not_block_event_loop(monkeypatch):
+    import asyncio
+    import threading
+
+    import httpx
+
+    release = threading.Event()
+
+    def slow_dump(url, **kw):
+        release.wait(5)
+        return "done"
+
+    monkeypatch.setattr(server, "dump_repo", slow_dump)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            dump = asyncio.create_task(
+                c.get("/dump/foo/bar", headers={"Accept-Encoding": "gzip"})
+            )
+            await asyncio.sleep(0.05)
+            gui = await c.get("/")
+            assert not dump.done()
+            release.set()
+            return gui, await dump
+
+    gui, dump = asyncio.run(scenario())
+    assert gui.status_code == 200
+    assert dump.text == "done"
+
+
+def test_remote_dumps_are_cached_per_options(monkeypatch):
+    calls = []
+
+    def fake_dump(url, **kw):
+        calls.append(kw["private_token"])
+        return f"dump for {kw['private_token']}"
+
+    monkeypatch.setattr(server, "dump_repo", fake_dump)
+    client = TestClient(server.app)
+    gzip_only = {"Accept-Encoding": "gzip"}
+    first = client.get("/dump/foo/bar", headers=gzip_only)
+    again = client.get("/dump/foo/bar", headers=gzip_only)
+    other = client.get("/dump/foo/bar?private_token=t", headers=gzip_only)
+    assert first.text == again.text == "dump for None"
+    assert other.text == "dump for t"
+    assert calls == [None, "t"]
+
+    monkeypatch.setattr(server, "_RESPONSE_CACHE_TTL", 0.0)
+    client.get("/dump/foo/bar", headers=gzip_only)
+    assert calls == [None, "t", None]
+
+
+def test_dump_request_is_frozen_and_defaults_shared(monkeypatch):
+    seen = []
+    monkeypatch.setattr(
+        server, "dump_repo", lambda url, **kw: seen.append((url, kw)) or "x"
+    )
+    client = TestClient(server.app)
+    gzip_only = {"Accept-Encoding": "gzip"}
+    assert client.post("/dump/foo/bar", headers=gzip_only).text == "x"
+    url, kw = seen[0]
+    assert url == "https://github.com/foo/bar"
+    assert kw["include"] == ["*"] and kw["fmt"] == "text"
+
+    with pytest.raises(ValidationError):
+        server._DEFAULT_DUMP_REQUEST.max_size = 1
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_json_dump_response(monkeypatch, use_orjson):
+    import json
+
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(server, "orjson", None)
+    monkeypatch.setattr(server, "dump_repo", lambda url, **kw: 'a "b" é\n')
+    client = TestClient(server.app)
+    resp = client.get(
+        "/dump/foo/bar",
+        params={"format": "json"},
+        headers={"Accept-Encoding": "identity"},
+    )
+    assert resp.headers["content-type"] == "application/json"
+    assert json.loads(resp.content) == {"status": "success", "content": 'a "b" é\n'}
+
+
+def test_gui_negotiates_encoding():
+    from uithub_local.gui import HTML_BYTES
+
+    client = TestClient(server.app)
+    refused = client.get("/", headers={"Accept-Encoding": "gzip;q=0"})
+    assert "content-encoding" not in refused.headers
+    assert refused.headers["vary"] == "Accept-Encoding"
+    assert refused.content == HTML_BYTES
+
+    packed = client.get("/", headers={"Accept-Encoding": "br;q=0, gzip"})
+    assert packed.headers["content-encoding"] == "gzip"
+    assert packed.content == HTML_BYTES
@@ -226,3 +226,39 @@ def test_split_single_large_file(tmp_path: Path):
     # Should create at least one file (single large file can't be split further)
     split_files = list(tmp_path.glob(f"{tmp_path.name}_*.txt"))
     assert len(split_files) >= 1
+
+
+def test_render_split_parts_share_timestamp(tmp_path: Path):
+    """All parts of one split render carry the same timestamp."""
+    for name in ("a.txt", "b.txt", "c.txt"):
+        (tmp_path / name).write_text(name[0] * 100)
+
+    files = collect_files(tmp_path, ["*.txt"], [])
+    outputs = render_split(files, tmp_path, split_tokens=50)
+
+    headers = {content.splitlines()[0] for _, content in outputs}
+    assert len(outputs) > 1
+    assert len(headers) == 1
+
+
+def test_split_by_tokens_matches_greedy_packing(tmp_path: Path):
+    """Bisecting prefix sums packs chunks exactly like a greedy scan."""
+    import random
+
+    from uithub_local.renderer import Dump
+
+    rng = random.Random(0)
+    for i in range(40):
+        (tmp_path / f"f{i:02}.txt").write_text("word " * rng.choice([0, 1, 5, 30]))
+    dump = Dump(collect_files(tmp_path, ["*.txt"], []), tmp_path)
+
+    for limit in (1, 5, 17, 60, 10_000):
+        expected, current, used = [], [], 0
+        for fd in dump.file_dumps:
+            if used + fd.tokens > limit and current:
+                expected.append(current)
+                current, used = [], 0
+            current.append(fd)
+            used += fd.tokens
+        expected.append(current)
+        assert dump.split_by_tokens(limit) == expected
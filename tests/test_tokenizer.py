@@ -11,3 +11,45 @@ def test_total_tokens(tmp_path: Path):
     p = tmp_path / "a.txt"
     p.write_text("hello")
     assert total_tokens([p]) >= 1
+
+
+def test_total_tokens_counts_large_files(tmp_path: Path, monkeypatch):
+    from uithub_local import tokenizer
+
+    monkeypatch.setattr(tokenizer, "_encoding", lambda: None)
+    big = tmp_path / "big.txt"
+    big.write_text("abcd" * (2 * 1024 * 1024))
+    assert total_tokens([big]) == 2 * 1024 * 1024
+
+
+class _FakeEncoding:
+    def encode_ordinary(self, text):
+        return text.split()
+
+    def encode_ordinary_batch(self, texts, num_threads=1):
+        return [text.split() for text in texts]
+
+
+def test_approximate_tokens_batch(monkeypatch):
+    from uithub_local import tokenizer
+
+    texts = ["a b c", "", "one"]
+    monkeypatch.setattr(tokenizer, "_ENCODING", _FakeEncoding())
+    monkeypatch.setattr(tokenizer.os, "cpu_count", lambda: 4)
+    assert tokenizer.approximate_tokens_batch(texts) == [3, 0, 1]
+    assert [tokenizer.approximate_tokens(t) for t in texts] == [3, 0, 1]
+
+
+def test_encoding_failure_is_not_retried_immediately(monkeypatch):
+    import time
+
+    from uithub_local import tokenizer
+
+    monkeypatch.setattr(tokenizer, "_ENCODING", None)
+    monkeypatch.setattr(tokenizer, "_ENCODING_FAILED_AT", time.monotonic())
+    monkeypatch.setitem(__import__("sys").modules, "tiktoken", None)
+    assert tokenizer.approximate_tokens("x" * 40) == 10
+    assert tokenizer.approximate_tokens_batch(["x" * 8, ""]) == [2, 1]
+    monkeypatch.setattr(tokenizer, "_ENCODING_FAILED_AT", None)
+    assert tokenizer._encoding() is None
+    assert tokenizer._ENCODING_FAILED_AT is not None
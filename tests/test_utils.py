@@ -47,3 +47,128 @@ def test_is_binary_path_code_extensions(tmp_path):
         f.write_bytes(b"\0null byte makes it binary")
         assert is_binary_path(f, strict=True)
         assert is_binary_path(f, strict=False)
+
+
+def test_is_binary_path_threshold(tmp_path):
+    from uithub_local.utils import is_binary_path
+
+    edge = tmp_path / "edge.txt"
+    edge.write_bytes(b"\x1b" * 3 + b"a\tb\r\ncdef"[:7])
+    assert not is_binary_path(edge)
+    edge.write_bytes(b"\x1b" * 4 + b"abcdef")
+    assert is_binary_path(edge)
+
+
+def test_mime_lookup_cached_by_suffix(tmp_path):
+    from uithub_local.utils import _mime_for_suffix, is_binary_path
+
+    _mime_for_suffix.cache_clear()
+    for name in ("a.mov", "b.mov", "c.MOV"):
+        (tmp_path / name).write_bytes(b"mov-ish text")
+        assert is_binary_path(tmp_path / name)
+    info = _mime_for_suffix.cache_info()
+    assert (info.misses, info.hits) == (1, 2)
+
+
+def test_only_text_guesses_are_read(tmp_path, monkeypatch):
+    from pathlib import Path
+
+    from uithub_local import utils
+
+    reads = []
+    real_read_head = utils._read_head
+
+    def counting_read_head(path, *args):
+        reads.append(Path(path).name)
+        return real_read_head(path, *args)
+
+    monkeypatch.setattr(utils, "_read_head", counting_read_head)
+    (tmp_path / "notes.txt").write_bytes(b"text\0with a NUL")
+    (tmp_path / "doc.pdf").write_text("%PDF-1.4")
+    (tmp_path / "logo.png").write_text("not really")
+    # text/* guesses must still be read: that is how the NUL is caught.
+    assert utils.is_binary_path(tmp_path / "notes.txt")
+    # Well-known binary extensions and non-text guesses are rejected unread.
+    assert utils.is_binary_path(tmp_path / "doc.pdf")
+    assert utils.is_binary_path(tmp_path / "logo.png")
+    assert reads == ["notes.txt"]
+
+
+def test_read_head(tmp_path):
+    import pytest
+
+    from uithub_local.utils import _read_head
+
+    target = tmp_path / "f.bin"
+    target.write_bytes(b"x" * 10_000)
+    assert _read_head(target) == b"x" * 8192
+    assert _read_head(target, 4) == b"xxxx"
+    with pytest.raises(OSError):
+        _read_head(tmp_path / "missing")
+    with pytest.raises(OSError):
+        _read_head(tmp_path)
+
+
+def test_classify_paths_matches_is_binary_path(tmp_path):
+    from uithub_local.utils import classify_paths, is_binary_path
+
+    samples = {
+        "a.txt": b"hello\n",
+        "b.py": b"\x80\x81\x82\x83 ab",
+        "c.txt": b"\x80\x81\x82\x83 ab",
+        "d.png": b"not really a png",
+        "e.c": b"int\0main;",
+        "empty.txt": b"",
+    }
+    paths = []
+    for name, raw in samples.items():
+        (tmp_path / name).write_bytes(raw)
+        paths.append(tmp_path / name)
+    paths.append(tmp_path / "missing.txt")
+    for strict in (True, False):
+        expected = [is_binary_path(p, strict=strict) for p in paths]
+        assert classify_paths(paths, strict=strict) == expected
+        assert classify_paths(map(str, paths), strict=strict) == expected
+    assert classify_paths(paths) == [False, False, True, True, True, False, True]
+
+
+def test_binary_extensions_skip_reading(tmp_path, monkeypatch):
+    from uithub_local import utils
+
+    lib = tmp_path / "libfoo.so"
+    lib.write_text("looks like text")
+    reads = []
+    real = utils._read_head
+    monkeypatch.setattr(
+        utils, "_read_head", lambda p, *a: reads.append(p) or real(p)
+    )
+    assert utils.is_binary_path(lib)
+    assert utils.is_binary_path(tmp_path / "missing.PNG")
+    assert reads == []
+
+
+def test_classify_paths_caches_unchanged_files(tmp_path, monkeypatch):
+    import os
+
+    from uithub_local import utils
+
+    monkeypatch.setattr(utils, "_BINARY_CACHE", type(utils._BINARY_CACHE)())
+    old = tmp_path / "old.txt"
+    old.write_text("hello")
+    os.utime(old, ns=(1_000_000_000, 1_000_000_000))
+    fresh = tmp_path / "fresh.txt"
+    fresh.write_text("hello")
+    reads = []
+    real_read = utils._read_head
+    monkeypatch.setattr(
+        utils, "_read_head", lambda p, *a: reads.append(p.name) or real_read(p, *a)
+    )
+    assert utils.classify_paths([old, fresh]) == [False, False]
+    assert utils.classify_paths([old, fresh], stats=[old.stat(), fresh.stat()]) == [
+        False,
+        False,
+    ]
+    # The old file is served from the cache; the just-written one is re-read.
+    assert reads == ["old.txt", "fresh.txt", "fresh.txt"]
+    old.write_bytes(b"\0\0\0\0\0")
+    assert utils.is_binary_path(old)
@@ -176,3 +176,180 @@ def test_collect_files_no_gitignore(tmp_path):
     # Should include all files when no .gitignore exists
     assert "app.log" in names
     assert "readme.txt" in names
+
+
+def test_collect_files_across_classify_batches(tmp_path, monkeypatch):
+    from uithub_local import walker
+
+    monkeypatch.setattr(walker, "_CLASSIFY_BATCH", 3)
+    for i in range(10):
+        (tmp_path / f"t{i}.txt").write_text("hi")
+        (tmp_path / f"b{i}.dat").write_bytes(b"\0\1")
+    files = walker.collect_files(tmp_path, ["*"], [])
+    assert sorted(f.path.name for f in files) == [f"t{i}.txt" for i in range(10)]
+
+
+def test_collect_files_prunes_ignored_dirs(tmp_path, monkeypatch):
+    import os
+
+    from uithub_local import walker
+
+    (tmp_path / ".gitignore").write_text("build/\n")
+    for name in ("build", "node_modules", "src"):
+        (tmp_path / name / "deep").mkdir(parents=True)
+        (tmp_path / name / "deep" / "f.txt").write_text("hi")
+    scanned = []
+    real_scandir = walker.os.scandir
+
+    def spy(path):
+        scanned.append(os.path.relpath(path, tmp_path))
+        return real_scandir(path)
+
+    monkeypatch.setattr(walker.os, "scandir", spy)
+    files = walker.collect_files(tmp_path, ["*"], ["node_modules"])
+    assert [f.path.as_posix() for f in files] == [".gitignore", "src/deep/f.txt"]
+    assert sorted(scanned) == [".", "src", os.path.join("src", "deep")]
+
+    scanned.clear()
+    files = walker.collect_files(tmp_path, ["*"], ["src/deep", "node_*/**"])
+    assert [f.path.as_posix() for f in files] == [".gitignore"]
+    assert sorted(scanned) == [".", "src"]
+
+
+def test_compile_globs_matches_fnmatch():
+    import fnmatch
+
+    from uithub_local.walker import _compile_globs
+
+    patterns = ["*.py", "docs/**", "a?c", "[!x]y", "lit.txt"]
+    fused = _compile_globs(patterns)
+    names = ["m.py", "docs/a/b", "abc", "zy", "xy", "lit.txt", "lit.txtx", "d/m.py"]
+    for name in names:
+        expected = any(fnmatch.fnmatch(name, p) for p in patterns)
+        assert bool(fused.match(name)) is expected, name
+    assert _compile_globs([]) is None
+
+
+def test_collect_files_nested_gitignore(tmp_path):
+    from uithub_local.walker import collect_files
+
+    (tmp_path / ".gitignore").write_text("*.log\nbuild/\n!build/keep.txt\n")
+    (tmp_path / "build").mkdir()
+    (tmp_path / "build" / "keep.txt").write_text("x")
+    sub = tmp_path / "pkg"
+    sub.mkdir()
+    (sub / ".gitignore").write_text("!trace.log\n/local.txt\n")
+    for name in ("trace.log", "other.log", "local.txt", "kept.txt"):
+        (sub / name).write_text("x")
+    (sub / "deep").mkdir()
+    (sub / "deep" / "local.txt").write_text("x")
+
+    names = sorted(f.path.as_posix() for f in collect_files(tmp_path))
+    # Like git: a nested file overrides outer rules relative to its own
+    # directory, and nothing inside an ignored directory is re-included.
+    assert names == [
+        ".gitignore",
+        "pkg/.gitignore",
+        "pkg/deep/local.txt",
+        "pkg/kept.txt",
+        "pkg/trace.log",
+    ]
+
+
+def test_collect_files_gitignore_directory_rules(tmp_path):
+    from uithub_local.walker import collect_files
+
+    (tmp_path / ".gitignore").write_text("b/**\n!*.txt\n*.log\n!*/\nsrc/**/\n")
+    for rel in ("b/keep.txt", "b/drop.md", "x.log/f.txt", "src/f.txt", "src/d/g.txt"):
+        (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel).write_text("x")
+
+    names = sorted(f.path.as_posix() for f in collect_files(tmp_path))
+    # "b/**" ignores b's contents but not b, so "!*.txt" can re-include;
+    # "!*/" re-includes the x.log directory; "src/**/" only hides subdirs.
+    assert names == [".gitignore", "b/keep.txt", "src/f.txt", "x.log/f.txt"]
+
+
+def test_collect_files_threaded_batches_keep_walk_order(tmp_path, monkeypatch):
+    from uithub_local import walker
+
+    for d in range(4):
+        for i in range(9):
+            (tmp_path / f"d{d}").mkdir(exist_ok=True)
+            (tmp_path / f"d{d}" / f"f{i}.txt").write_text("hi")
+    inline = [f.path for f in walker.collect_files(tmp_path)]
+    monkeypatch.setattr(walker, "_CLASSIFY_BATCH", 2)
+    assert [f.path for f in walker.collect_files(tmp_path)] == inline
+    assert len(inline) == 36
+
+
+def test_ignore_layer_prefilter_matches_any_rule():
+    import pathspec
+
+    from uithub_local.walker import _ignore_layer
+
+    lines = ["*.log", "build/", "!keep.log", "/dist", "docs/**/*.bak", "x/**", "#c"]
+    spec = pathspec.GitIgnoreSpec.from_lines(lines)
+    [(prefix, patterns, fused)] = _ignore_layer("sub/", spec)
+    assert prefix == "sub/" and len(patterns) == 6
+    paths = [
+        "a.log",
+        "src/a.log",
+        "build/",
+        "a/build/",
+        "dist",
+        "a/dist",
+        "docs/b.bak",
+        "docs/q/b.bak",
+        "x/y",
+        "x/",
+        "src/main.py",
+        "rebuild/",
+        "keep.log",
+    ]
+    for path in paths:
+        expected = any(p.regex.search(path) for p in patterns)
+        assert (fused.search(path) is not None) is expected, path
+    assert _ignore_layer("", pathspec.GitIgnoreSpec.from_lines(["# only"])) == []
+
+
+def test_supported_pathspec_has_fusable_layout():
+    import pathspec
+
+    from uithub_local import walker
+
+    # pyproject.toml requires pathspec>=1.0; older releases compile other shapes.
+    assert int(pathspec.__version__.split(".")[0]) >= 1
+    assert walker._FUSABLE_LAYOUT
+
+
+def test_ignore_layer_falls_back_without_fusable_layout(tmp_path, monkeypatch):
+    import pathspec
+
+    from uithub_local import walker
+
+    (tmp_path / ".gitignore").write_text("*.log\nbuild/\n!keep.log\n")
+    for name in ("a.log", "keep.log", "build/x.txt", "src/b.log", "src/c.py"):
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text("hi")
+    fused = sorted(f.path.as_posix() for f in walker.collect_files(tmp_path))
+
+    monkeypatch.setattr(walker, "_FUSABLE_LAYOUT", False)
+    spec = pathspec.GitIgnoreSpec.from_lines(["*.log"])
+    [(_, _, prefilter)] = walker._ignore_layer("", spec)
+    assert prefilter is None
+    plain = sorted(f.path.as_posix() for f in walker.collect_files(tmp_path))
+    assert plain == fused == [".gitignore", "keep.log", "src/c.py"]
+
+
+def test_iter_files_streams_in_walk_order(tmp_path, monkeypatch):
+    from uithub_local import walker
+
+    for i in range(7):
+        (tmp_path / f"f{i}.txt").write_text("hi")
+    monkeypatch.setattr(walker, "_CLASSIFY_BATCH", 2)
+    expected = [f.path for f in walker.collect_files(tmp_path)]
+    assert [f.path for f in walker.iter_files(tmp_path)] == expected
+    files = walker.iter_files(tmp_path)
+    assert next(files).path == expected[0]
+    files.close()